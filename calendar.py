@@ -82,6 +82,14 @@ class SLXCalendarEntity(CalendarEntity):
         self._attr_name = name.capitalize()
         self._attr_unique_id = unique_id
 
+    async def async_added_to_hass(self) -> None:
+        """Refresh calendar when trip planner finishes reading odometer history."""
+        await super().async_added_to_hass()
+        if not self._tripplanner.ready:
+            self.async_on_remove(
+                self._tripplanner.add_ready_listener(self.async_write_ha_state)
+            )
+
     @property
     def event(self) -> CalendarEvent | None:
         """Return the next upcoming event."""
@@ -92,6 +100,9 @@ class SLXCalendarEntity(CalendarEntity):
     ) -> list[CalendarEvent]:
         """Get all events in a specific time frame."""
         tmp_list = []
+        if not self._tripplanner.ready:
+            _LOGGER.debug("Trip planner is %s, no events yet", self._tripplanner.state)
+            return tmp_list
 
         daily_trips = self._tripplanner.get_daily_trips(
             start_date.date(), end_date.date()
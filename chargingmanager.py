@@ -3,13 +3,14 @@
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.event import async_call_later
 from datetime import timedelta, datetime
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from enum import Enum
 from .slxcar import SLXCar
 from typing import Any
 
-
-# from bisect import bisect_left
+from array import array
+import math
+from bisect import bisect_left
 
 import homeassistant.util.dt as dt_util
 from .timer import SlxTimer
@@ -29,6 +30,7 @@ from .const import (
 
 
 CHARGING_EFFICIENCY: float = 0.80  # assumed efficiency of charging.
+CHARGE_RATE_MIN_SPAN: int = 60  # time[s] of charging needed to estimate charge rate
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -48,20 +50,159 @@ class CarConnectedStates(Enum):
 class SlxEnergyTracker:
     """Class for tracking energy transferred during charging session
 
-    Prepare more detailed description using https://peps.python.org/pep-0257/
+    Session energy history is stored in two parallel columns (time as epoch seconds and energy in kWh)
+    backed by array('d'), which keeps a long charging session compact in memory.
+
+    New entries are compressed on the fly (swinging door): an entry is dropped if the line between
+    neighbouring kept entries interpolates it with error below history_tolerance. Interpolated energy
+    at any time differs from the one calculated on full history by less than history_tolerance.
+    If history still grows above history_limit entries, the oldest entries recorded before the
+    current SOC are removed (coordinator does not accept SOC moving backwards in time). If that is
+    not enough, every second entry recorded after SOC is dropped - entries bracketing SOC and the
+    last entry are always kept, so added energy is not affected.
     """
 
-    def __init__(self, soc_before_energy: int, soc_after_energy: int):
-        self._session_energy_history: list[tuple[datetime, float]] = []
-        self._soc_information: tuple[datetime, float] = (None, None)
+    __slots__ = (
+        "_history_time",
+        "_history_energy",
+        "_soc_time",
+        "_soc_level",
+        "_session_energy_at_soc",
+        "_soc_before_energy",
+        "_soc_after_energy",
+        "_plug_connected",
+        "_soc_index",
+        "_history_limit",
+        "_history_tolerance",
+        "_door_low",
+        "_door_high",
+        "_anchor_fixed",
+    )
+
+    def __init__(
+        self,
+        soc_before_energy: int,
+        soc_after_energy: int,
+        history_limit: int = 2000,
+        history_tolerance: float = 0.01,
+    ):
+        self._history_time: array[float] = array("d")
+        self._history_energy: array[float] = array("d")
+        self._soc_time: float = None
+        self._soc_level: float = None
         self._session_energy_at_soc: float = None
         self._soc_before_energy = soc_before_energy
         self._soc_after_energy = soc_after_energy
         self._plug_connected: bool = False
+        # index of the first history entry recorded at or after SOC time (None - not calculated yet)
+        self._soc_index: int = None
+        self._history_limit: int = history_limit
+        self._history_tolerance: float = history_tolerance
+        # range of slopes (from the last but one entry) for which all dropped entries are within tolerance
+        self._door_low: float = -math.inf
+        self._door_high: float = math.inf
+        # True when new entries cannot change _session_energy_at_soc (they are added after SOC bracket)
+        self._anchor_fixed: bool = False
 
     def _clear_history(self):
-        self._session_energy_history.clear()
+        del self._history_time[:]
+        del self._history_energy[:]
         self._session_energy_at_soc = None
+        self._soc_index = None
+        self._anchor_fixed = False
+        self._door_low = -math.inf
+        self._door_high = math.inf
+
+    def _find_soc_index(self) -> int:
+        """Return index of the first history entry recorded at or after SOC time.
+
+        Index is cached and only searched again (using bisect) when a new SOC arrives
+        or history is cleared. Appending entries keeps the cached value up to date.
+        """
+        if self._soc_index is None:
+            self._soc_index = bisect_left(self._history_time, self._soc_time)
+        return self._soc_index
+
+    def _append_history(self, entry_time: float, entry_energy: float) -> None:
+        """Add entry to history, replacing the last one if it can be interpolated within tolerance."""
+        history_time = self._history_time
+        history_energy = self._history_energy
+        if len(history_time) >= 2:
+            anchor_time = history_time[-2]
+            anchor_energy = history_energy[-2]
+            last_time = history_time[-1]
+            last_span = last_time - anchor_time
+            entry_span = entry_time - anchor_time
+            if last_span > 0 and entry_span >= last_span:
+                last_energy = history_energy[-1]
+                tolerance = self._history_tolerance
+                door_low = max(
+                    self._door_low,
+                    (last_energy - tolerance - anchor_energy) / last_span,
+                )
+                door_high = min(
+                    self._door_high,
+                    (last_energy + tolerance - anchor_energy) / last_span,
+                )
+                slope = (entry_energy - anchor_energy) / entry_span
+                if door_low <= slope <= door_high:
+                    # last entry can be dropped - replace it with the new one.
+                    self._door_low = door_low
+                    self._door_high = door_high
+                    history_time[-1] = entry_time
+                    history_energy[-1] = entry_energy
+                    if (
+                        self._soc_index is not None
+                        and last_time < self._soc_time <= entry_time
+                    ):
+                        self._soc_index -= 1
+                    return
+
+        # last entry is kept and becomes an anchor for the next ones.
+        self._door_low = -math.inf
+        self._door_high = math.inf
+        history_time.append(entry_time)
+        history_energy.append(entry_energy)
+        # entry added before SOC time moves the first entry after SOC by one position.
+        if self._soc_index is not None and entry_time < self._soc_time:
+            self._soc_index += 1
+
+        if len(history_time) > self._history_limit:
+            self._trim_history()
+
+    def _trim_history(self) -> None:
+        """Remove the oldest entries, keeping entries which are needed to interpolate SOC"""
+        to_remove = len(self._history_time) - self._history_limit
+        if self._soc_time is not None:
+            # keep the entry before SOC and everything after
+            to_remove = min(to_remove, self._find_soc_index() - 1)
+        if to_remove > 0:
+            del self._history_time[:to_remove]
+            del self._history_energy[:to_remove]
+            if self._soc_index is not None:
+                self._soc_index -= to_remove
+            _LOGGER.debug("Removed %d oldest session energy entries", to_remove)
+        if len(self._history_time) > self._history_limit:
+            self._decimate_history()
+
+    def _decimate_history(self) -> None:
+        """Drop every second entry after SOC until history fits history_limit"""
+        history_time = self._history_time
+        history_energy = self._history_energy
+        # entries bracketing SOC and the last entry are kept
+        start = self._find_soc_index() + 1
+        removed: int = 0
+        while len(history_time) > self._history_limit:
+            end = len(history_time) - 1
+            if end <= start:
+                break
+            removed += len(range(start, end, 2))
+            del history_time[start:end:2]
+            del history_energy[start:end:2]
+        # anchor of the last entry changed, compression starts again
+        self._door_low = -math.inf
+        self._door_high = math.inf
+        _LOGGER.debug("Decimated %d session energy entries recorded after SOC", removed)
 
     def connect_plug(self):
         self._plug_connected = True
@@ -70,104 +211,139 @@ class SlxEnergyTracker:
         self._plug_connected = False
         self._clear_history()
 
-    def add_entry(self, new_session_energy: float) -> bool:
+    def _entry_timestamp(self, entry_time: datetime | None) -> float:
+        """Translate entry time into epoch seconds, entries cannot move backwards in time"""
+        if entry_time is None:
+            entry_timestamp = dt_util.utcnow().timestamp()
+        else:
+            entry_timestamp = entry_time.timestamp()
+        if self._history_time and entry_timestamp < self._history_time[-1]:
+            _LOGGER.debug(
+                "Session energy entry older than the last one, using last time"
+            )
+            entry_timestamp = self._history_time[-1]
+        return entry_timestamp
+
+    def add_entry(self, new_session_energy: float, new_time: datetime = None) -> bool:
         # if plug is not connected skip adding energy to the storage
         if self._plug_connected is False:
             return False
-        self._session_energy_history.append((dt_util.utcnow(), new_session_energy))
+        self._append_history(self._entry_timestamp(new_time), new_session_energy)
+        if self._anchor_fixed:
+            # energy at SOC is already known, only the last entry changed.
+            return True
+        return self.calculate_estimated_session()
+
+    def add_entries(self, entries: Iterable[tuple[datetime, float]]) -> bool:
+        """Add batch of (time, energy) entries and estimate session once at the end.
+
+        Entries with missing time or invalid energy are skipped.
+        """
+        if self._plug_connected is False:
+            return False
+        skipped: int = 0
+        for entry_time, entry_energy in entries:
+            if (
+                entry_time is None
+                or entry_energy is None
+                or not math.isfinite(entry_energy)
+            ):
+                skipped += 1
+                continue
+            self._append_history(self._entry_timestamp(entry_time), entry_energy)
+        if skipped > 0:
+            _LOGGER.warning("Skipped %d invalid session energy entries", skipped)
+        self._anchor_fixed = False
         return self.calculate_estimated_session()
 
     def update_soc(self, new_time: datetime, soc_level: float) -> bool:
-        self._soc_information = (new_time, soc_level)
+        self._soc_time = new_time.timestamp()
+        self._soc_level = soc_level
+        self._soc_index = None
+        self._anchor_fixed = False
         return self.calculate_estimated_session()
 
     def calculate_estimated_session(self) -> bool:
         # few conditions need to be met to calculate ammount of energy
         if self._plug_connected is False:
             return False
-        length_of_history = len(self._session_energy_history)
+        length_of_history = len(self._history_time)
 
         # if no soc information is provided - we cannot estimate SOC
-        if self._soc_information[0] is None:
+        if self._soc_time is None:
             return False
 
         if length_of_history == 0:
             return False
 
+        history_time = self._history_time
+        history_energy = self._history_energy
+        soc_time = self._soc_time
+
         if length_of_history >= 2:
             # we approach finding SOC value in between session energy entries
-            index: int = -1
-            for i in range(length_of_history):
-                # find first value stored after soc was checked
-                if self._session_energy_history[i][0] >= self._soc_information[0]:
-                    index = i
-                    break
-            if index > 0:
-                lower_value = self._session_energy_history[index - 1]
-                higher_value = self._session_energy_history[index]
-
-                total_diff: timedelta = higher_value[0] - lower_value[0]
-                partial_diff: timedelta = self._soc_information[0] - lower_value[0]
+            # find first value stored after soc was checked
+            index: int = self._find_soc_index()
+            if 0 < index < length_of_history:
+                total_diff: float = history_time[index] - history_time[index - 1]
+                partial_diff: float = soc_time - history_time[index - 1]
                 factor: float = 0
-                if total_diff.seconds > 0:
-                    factor = partial_diff.seconds / total_diff.seconds
-                self._session_energy_at_soc = lower_value[1] + factor * (
-                    higher_value[1] - lower_value[1]
+                if total_diff > 0:
+                    factor = partial_diff / total_diff
+                self._session_energy_at_soc = history_energy[index - 1] + factor * (
+                    history_energy[index] - history_energy[index - 1]
                 )
+                # last entry can still be replaced by compression, so bracket must end before it.
+                self._anchor_fixed = index < length_of_history - 1
                 return True
         # if we've reached that place it means that we have only one session energy entry OR soc time if before/after energy entries.
         # if SOC was measured before first energy entry ( or after last energy entry)
         # we will assume that _session_energy_at_soc can be calculated if time difference is not bigger than predefined time
-
-        # TODO - use slice notation "[-1:]"  OR  just [-1] to get the last element from the list (https://docs.python.org/2/tutorial/introduction.html#lists)
-        if self._soc_information[0] <= self._session_energy_history[0][0]:
-            soc_before: timedelta = (
-                self._session_energy_history[0][0] - self._soc_information[0]
-            )
-            if soc_before < timedelta(seconds=self._soc_before_energy):
-                self._session_energy_at_soc = self._session_energy_history[0][1]
+        if soc_time <= history_time[0]:
+            soc_before: float = history_time[0] - soc_time
+            if soc_before < self._soc_before_energy:
+                self._session_energy_at_soc = history_energy[0]
+                self._anchor_fixed = True
                 return True
-        elif (
-            self._soc_information[0]
-            >= self._session_energy_history[length_of_history - 1][0]
-        ):
-            soc_after: timedelta = (
-                self._soc_information[0]
-                - self._session_energy_history[length_of_history - 1][0]
-            )
-            if soc_after < timedelta(seconds=self._soc_after_energy):
-                self._session_energy_at_soc = self._session_energy_history[
-                    length_of_history - 1
-                ][1]
+        elif soc_time >= history_time[-1]:
+            soc_after: float = soc_time - history_time[-1]
+            if soc_after < self._soc_after_energy:
+                self._session_energy_at_soc = history_energy[-1]
+                self._anchor_fixed = False
                 return True
+        self._anchor_fixed = False
         return False
 
     def get_added_energy(self) -> float:
         """Returns energy added since SOC was checked"""
         if self._session_energy_at_soc is None:
             return None
-        history_len = len(self._session_energy_history)
-        if history_len == 0:
+        if len(self._history_energy) == 0:
             return None
 
-        added_energy: float = (
-            self._session_energy_history[history_len - 1][1]
-            - self._session_energy_at_soc
-        )
+        added_energy: float = self._history_energy[-1] - self._session_energy_at_soc
         return added_energy
 
-    # def get_stored_soc(self) -> tuple(datetime,float):
+    def get_charge_rate(self) -> float:
+        """Returns average charging power [kW] since SOC was checked"""
+        if self._session_energy_at_soc is None or len(self._history_time) == 0:
+            return None
+        start_time = max(self._soc_time, self._history_time[0])
+        elapsed: float = self._history_time[-1] - start_time
+        if elapsed < CHARGE_RATE_MIN_SPAN:
+            return None
+        return (self._history_energy[-1] - self._session_energy_at_soc) * 3600 / elapsed
+
     def get_stored_soc(self) -> float:
-        return self._soc_information[1]
+        return self._soc_level
 
     def soc_validity(self) -> int:
         """returns for how long is SOC valid. Value in seconds >= 0"""
-        soc_time = self._soc_information[0]
-        if soc_time is None:
+        if self._soc_time is None:
             return 0
 
-        age_of_soc: timedelta = dt_util.utcnow() - soc_time
-        remaining_valid: int = self._soc_before_energy - age_of_soc.seconds
+        age_of_soc = int(dt_util.utcnow().timestamp() - self._soc_time)
+        remaining_valid: int = self._soc_before_energy - age_of_soc
         if remaining_valid < 0:
             return 0
         else:
@@ -182,6 +358,8 @@ class SLXChargingManager:
         self._energy_tracker = SlxEnergyTracker(
             soc_before_energy=car_config[SLXCar.CONF_SOC_BEFORE_ENERGY],
             soc_after_energy=car_config[SLXCar.CONF_SOC_AFTER_ENERGY],
+            history_limit=car_config[SLXCar.CONF_SESSION_HISTORY_LIMIT],
+            history_tolerance=car_config[SLXCar.CONF_SESSION_HISTORY_TOLERANCE],
         )
 
         # status when car connected
@@ -197,6 +375,10 @@ class SLXChargingManager:
         self._target_soc: float = None
         self._charge_method: str = None
 
+        # cached for recalculating energy - battery energy at SOC check, SOC percentage of 1 kWh
+        self._bat_energy_at_soc: float = None
+        self._soc_per_kwh: float = None
+
         # calculated values
         self._attr_bat_energy_estimated: float = None
         self._attr_bat_soc_estimated: float = None
@@ -204,6 +386,10 @@ class SLXChargingManager:
         self._attr_request_soc_update: int = 0
 
         self._evse_value: str = None
+        # when EVSE mode was selected in current session, None if not selected yet
+        self._evse_mode_since: datetime = None
+        self._soc_hysteresis: float = car_config[SLXCar.CONF_SOC_HYSTERESIS]
+        self._mode_min_dwell = timedelta(seconds=car_config[SLXCar.CONF_MODE_MIN_DWELL])
 
         # not exposed yet
         self._attr_charging_active: bool = False
@@ -227,10 +413,28 @@ class SLXChargingManager:
             timedelta(seconds=soc_next_update),
             self.callback_bat_update,
         )
+        # next SOC request is planned from charging progress within those limits
+        self._soc_min_next_update: int = car_config[SLXCar.CONF_SOC_MIN_NEXT_UPDATE]
+        self._soc_max_next_update: int = car_config[SLXCar.CONF_SOC_MAX_NEXT_UPDATE]
+        self._next_soc_request_time: datetime = None
+
+        # setting changes within decision delay are coalesced into one EVSE decision
+        self._decision_delay: float = car_config[SLXCar.CONF_DECISION_DELAY]
+        self._evse_decision_pending: bool = False
+        # EVSE mode change blocked by minimum dwell time is checked again when it passes
+        self._evse_dwell_pending: bool = False
+        self.timer_evse_decision = SlxTimer(
+            self.hass,
+            timedelta(seconds=self._decision_delay),
+            self.callback_evse_decision,
+        )
 
     def cleanup(self):
         self.timer_soc_request_timeout.cancel_timer()
         self.timer_next_soc_request.cancel_timer()
+        self.timer_evse_decision.cancel_timer()
+        self._evse_decision_pending = False
+        self._evse_dwell_pending = False
 
     def set_energy_estimated_callback(self, ext_callback: Callable[[float], None]):
         self._callback_energy_estimated = ext_callback
@@ -241,6 +445,10 @@ class SLXChargingManager:
     def set_charger_mode_callback(self, ext_callback: Callable[[str], None]):
         self._callback_set_charger_mode = ext_callback
 
+    @property
+    def charging_active(self) -> bool:
+        return self._attr_charging_active
+
     @property
     def battery_capacity(self):
         return self._battery_capacity
@@ -248,6 +456,7 @@ class SLXChargingManager:
     @battery_capacity.setter
     def battery_capacity(self, new_bat_capacity: float):
         self._battery_capacity = new_bat_capacity
+        self._bat_energy_at_soc = None
 
     @property
     def soc_minimum(self):
@@ -259,7 +468,7 @@ class SLXChargingManager:
         old_value = self._soc_minimum
         self._soc_minimum = new_value
         if old_value is not None and old_value != new_value:
-            self.calculate_evse_state()
+            self.schedule_evse_state()
 
     @property
     def soc_maximum(self):
@@ -270,7 +479,7 @@ class SLXChargingManager:
         old_value = self._soc_maximum
         self._soc_maximum = new_value
         if old_value is not None and old_value != new_value:
-            self.calculate_evse_state()
+            self.schedule_evse_state()
 
     @property
     def target_soc(self):
@@ -281,7 +490,7 @@ class SLXChargingManager:
         old_value = self._target_soc
         self._target_soc = new_value
         if old_value is not None and old_value != new_value:
-            self.calculate_evse_state()
+            self.schedule_evse_state()
 
     @property
     def charge_method(self):
@@ -296,7 +505,7 @@ class SLXChargingManager:
             and old_value != new_value
             and new_value != CHR_METHOD_MANUAL
         ):
-            self.calculate_evse_state()
+            self.schedule_evse_state()
 
     def set_soc_level(self, new_soc_level: float, new_soc_update: datetime = None):
         self.timer_soc_request_timeout.cancel_timer()
@@ -308,12 +517,21 @@ class SLXChargingManager:
         can_calculate: bool = self._energy_tracker.update_soc(
             soc_update_time, new_soc_level
         )
-        self.timer_next_soc_request.schedule_timer()
+        self._bat_energy_at_soc = None
+        self.schedule_soc_request()
         if can_calculate is True:
             self.recalculate_energy()
 
     def add_charger_energy(self, new_charger_energy: float, new_time: datetime = None):
-        can_calculate: bool = self._energy_tracker.add_entry(new_charger_energy)
+        can_calculate: bool = self._energy_tracker.add_entry(
+            new_charger_energy, new_time
+        )
+        if can_calculate is True:
+            self.recalculate_energy()
+
+    def add_charger_energies(self, entries: Iterable[tuple[datetime, float]]):
+        """Add batch of (time, charger energy) entries, e.g. read from history. Energy is recalculated once."""
+        can_calculate: bool = self._energy_tracker.add_entries(entries)
         if can_calculate is True:
             self.recalculate_energy()
 
@@ -322,15 +540,19 @@ class SLXChargingManager:
         if added_energy is None:
             return False
 
-        soc_checked = self._energy_tracker.get_stored_soc()
-        if soc_checked is None:
-            return False
+        if self._bat_energy_at_soc is None:
+            # SOC or battery capacity changed since last calculation
+            soc_checked = self._energy_tracker.get_stored_soc()
+            if soc_checked is None:
+                return False
+            self._bat_energy_at_soc = (soc_checked / 100.0) * self._battery_capacity
+            self._soc_per_kwh = 100 / self._battery_capacity
 
         self._attr_bat_energy_estimated = (
-            soc_checked / 100.0
-        ) * self._battery_capacity + added_energy * CHARGING_EFFICIENCY
+            self._bat_energy_at_soc + added_energy * CHARGING_EFFICIENCY
+        )
         self._attr_bat_soc_estimated = (
-            self._attr_bat_energy_estimated * 100 / self.battery_capacity
+            self._attr_bat_energy_estimated * self._soc_per_kwh
         )
 
         if self._callback_energy_estimated is not None:
@@ -338,6 +560,7 @@ class SLXChargingManager:
             self._car_connected_status = CarConnectedStates.soc_known
             self._callback_energy_estimated(self._attr_bat_energy_estimated)
 
+        self.plan_soc_request()
         self.calculate_evse_state()
 
     def plug_connected(
@@ -360,6 +583,30 @@ class SLXChargingManager:
             self._car_connected_status = CarConnectedStates.ramping_up
             self.request_bat_soc_update()
 
+    def restore_session(
+        self,
+        energy_entries: Iterable[tuple[datetime, float]],
+        soc_level: float = None,
+        soc_update: datetime = None,
+    ):
+        """called at startup when plug is already connected, rebuilds session from history"""
+        _LOGGER.info("Restore charging session")
+        self._attr_charging_active = True
+
+        self._energy_tracker.connect_plug()
+        if soc_level is not None and soc_update is not None:
+            self._energy_tracker.update_soc(soc_update, soc_level)
+            self._bat_energy_at_soc = None
+            self.schedule_soc_request()
+
+        can_calculate = self._energy_tracker.add_entries(energy_entries)
+        if can_calculate:
+            self._car_connected_status = CarConnectedStates.soc_known
+            self.recalculate_energy()
+        else:
+            self._car_connected_status = CarConnectedStates.ramping_up
+            self.request_bat_soc_update()
+
     def plug_disconnected(self):
         """called when plug got disconnected"""
         _LOGGER.info("Plug disconnected")
@@ -372,6 +619,9 @@ class SLXChargingManager:
         self._attr_bat_energy_estimated = None
         self._attr_bat_soc_estimated = None
         self._attr_charging_session_duration = None
+        self._evse_mode_since = None
+        self._next_soc_request_time = None
+        self._cancel_dwell_recheck()
 
         self._energy_tracker.disconnect_plug()
 
@@ -388,6 +638,52 @@ class SLXChargingManager:
         else:
             _LOGGER.warning("Callback for SOC requested is not set up")
 
+    def schedule_soc_request(self, wait_time: timedelta = None):
+        """Schedule next SOC request, by default after CONF_SOC_NEXT_UPDATE"""
+        if wait_time is None:
+            wait_time = self.timer_next_soc_request.wait_time
+        self._next_soc_request_time = dt_util.utcnow() + wait_time
+        self.timer_next_soc_request.schedule_timer(wait_time)
+
+    def plan_soc_request(self):
+        """Move next SOC request close to the moment estimated SOC crosses SOC limits"""
+        if self._attr_charging_active is False or self._next_soc_request_time is None:
+            return
+        charge_rate = self._energy_tracker.get_charge_rate()
+        if charge_rate is None:
+            return  # keep default schedule until charge rate is known
+
+        time_now = dt_util.utcnow()
+        if self._next_soc_request_time - time_now < timedelta(
+            seconds=self._soc_min_next_update
+        ):
+            return  # request is close already, do not postpone it
+
+        soc = self._attr_bat_soc_estimated
+        # SOC [%] added per second
+        soc_rate = charge_rate * CHARGING_EFFICIENCY * self._soc_per_kwh / 3600
+        soc_limits = [
+            limit
+            for limit in (self._soc_minimum, self._soc_maximum, self._target_soc)
+            if limit is not None and limit > soc
+        ]
+        if soc_rate > 0 and soc_limits:
+            wait_seconds = (min(soc_limits) - soc) / soc_rate
+        else:
+            wait_seconds = self._soc_max_next_update
+        wait_seconds = min(
+            max(wait_seconds, self._soc_min_next_update), self._soc_max_next_update
+        )
+
+        next_request_time = time_now + timedelta(seconds=wait_seconds)
+        difference = next_request_time - self._next_soc_request_time
+        if abs(difference.total_seconds()) < max(60, 0.05 * wait_seconds):
+            return  # do not re-schedule timer for small changes
+        _LOGGER.debug(
+            "Charging %.2f kW, next SOC request in %d s", charge_rate, wait_seconds
+        )
+        self.schedule_soc_request(timedelta(seconds=wait_seconds))
+
     def request_evse_set(self, evse_mode: str):
         # for evse mode use CHARGER_MODES
         _LOGGER.info("Request EVSE set to move %s", evse_mode)
@@ -397,11 +693,46 @@ class SLXChargingManager:
         else:
             _LOGGER.warning("Callback for setting charger mode is not set up")
 
+    def schedule_evse_state(self) -> None:
+        """Calculate EVSE state once decision delay passes, coalescing burst of setting changes"""
+        if self._decision_delay <= 0:
+            self.calculate_evse_state(forced=True)
+            return
+        if self._evse_decision_pending:
+            return  # decision already scheduled, it will use latest settings
+        # forced decision isn't blocked by dwell time
+        self._evse_dwell_pending = False
+        self._evse_decision_pending = True
+        self.timer_evse_decision.schedule_timer()
+
+    def _schedule_dwell_recheck(self) -> None:
+        if self._evse_decision_pending:
+            return  # forced decision is scheduled already
+        remaining = self._evse_mode_since + self._mode_min_dwell - dt_util.utcnow()
+        self._evse_dwell_pending = True
+        self.timer_evse_decision.schedule_timer(max(remaining, timedelta(0)))
+
+    def _cancel_dwell_recheck(self) -> None:
+        if self._evse_dwell_pending:
+            self._evse_dwell_pending = False
+            self.timer_evse_decision.cancel_timer()
+
+    @callback
+    def callback_evse_decision(self, _) -> None:
+        """Callback for SLXTimer - called when decision delay after setting change or minimum dwell time passed"""
+        if self._evse_dwell_pending:
+            _LOGGER.debug("Minimum dwell time passed")
+            self._evse_dwell_pending = False
+            self.calculate_evse_state()
+            return
+        _LOGGER.debug("Decision delay passed")
+        self.calculate_evse_state(forced=True)
+
     @callback
     def callback_soc_timeout(self, _) -> None:
         """Callback for SLXTimer - called when SOC Update timeouts"""
         _LOGGER.info("SOC Update timeouted")
-        self.timer_next_soc_request.schedule_timer()
+        self.schedule_soc_request()
         if self._car_connected_status is CarConnectedStates.ramping_up:
             self._car_connected_status = CarConnectedStates.autopilot
             self.calculate_evse_state()
@@ -414,10 +745,62 @@ class SLXChargingManager:
         if self._attr_charging_active is True:
             self.request_bat_soc_update()
 
-    def calculate_evse_state(self) -> None:
-        """Method is called to recalculate if what state should the charger be depending on charging manager status"""
+    def _select_evse_mode(self, soc: float) -> str | None:
+        """Select EVSE mode for given SOC based on SOC limits and charging method"""
+        new_evse_value: str = None
+        if soc < self.soc_minimum:
+            new_evse_value = CHR_MODE_NORMAL
+        elif soc < self.soc_maximum:
+            if self.charge_method == CHR_METHOD_ECO:
+                new_evse_value = CHR_MODE_PVCHARGE
+            if self.charge_method == CHR_METHOD_FAST:
+                if soc < self.target_soc:
+                    new_evse_value = CHR_MODE_NORMAL
+                else:
+                    new_evse_value = CHR_MODE_STOPPED
+        else:  # soc >= soc_maximum
+            if soc > self.target_soc:
+                new_evse_value = CHR_MODE_STOPPED
+            else:
+                if self.charge_method == CHR_METHOD_FAST:
+                    new_evse_value = CHR_MODE_NORMAL
+                if self.charge_method == CHR_METHOD_ECO:
+                    new_evse_value = CHR_MODE_PVCHARGE
+        return new_evse_value
+
+    def _stable_evse_mode(self, soc: float, new_evse_value: str) -> str:
+        """Keep current EVSE mode if SOC is within hysteresis band or mode is too fresh"""
+        hysteresis = self._soc_hysteresis
+        if hysteresis > 0 and (
+            self._select_evse_mode(soc - hysteresis) != new_evse_value
+            or self._select_evse_mode(soc + hysteresis) != new_evse_value
+        ):
+            _LOGGER.debug(
+                "SOC %.2f within hysteresis band, keep %s", soc, self._evse_value
+            )
+            return self._evse_value
+
+        if dt_util.utcnow() - self._evse_mode_since < self._mode_min_dwell:
+            _LOGGER.debug("Minimum dwell time not passed, keep %s", self._evse_value)
+            self._schedule_dwell_recheck()
+            return self._evse_value
+        return new_evse_value
+
+    def calculate_evse_state(self, forced: bool = False) -> None:
+        """Method is called to recalculate if what state should the charger be depending on charging manager status
+
+        If not forced (e.g. by setting change), SOC driven changes are subject to
+        hysteresis and minimum dwell time.
+        """
         new_evse_value: str = None
 
+        if self._evse_decision_pending:
+            # pending decision is covered by this calculation
+            self._evse_decision_pending = False
+            self.timer_evse_decision.cancel_timer()
+        # dwell time is checked again if change is still blocked
+        self._cancel_dwell_recheck()
+
         _LOGGER.info("Calculate EVSE state")
         _LOGGER.debug("_car_connected_status: %s", self._car_connected_status)
         _LOGGER.debug("_charge_method: %s", self._charge_method)
@@ -440,30 +823,23 @@ class SLXChargingManager:
 
             case CarConnectedStates.soc_known:
                 # we can select normal,sleep or PV charge.
-
-                if self._attr_bat_soc_estimated < self.soc_minimum:
-                    new_evse_value = CHR_MODE_NORMAL
-                elif self._attr_bat_soc_estimated < self.soc_maximum:
-                    if self.charge_method == CHR_METHOD_ECO:
-                        new_evse_value = CHR_MODE_PVCHARGE
-                    if self.charge_method == CHR_METHOD_FAST:
-                        if self._attr_bat_soc_estimated < self.target_soc:
-                            new_evse_value = CHR_MODE_NORMAL
-                        else:
-                            new_evse_value = CHR_MODE_STOPPED
-                else:  # soc >= soc_maximum
-                    if self._attr_bat_soc_estimated > self.target_soc:
-                        new_evse_value = CHR_MODE_STOPPED
-                    else:
-                        if self.charge_method == CHR_METHOD_FAST:
-                            new_evse_value = CHR_MODE_NORMAL
-                        if self.charge_method == CHR_METHOD_ECO:
-                            new_evse_value = CHR_MODE_PVCHARGE
+                soc = self._attr_bat_soc_estimated
+                new_evse_value = self._select_evse_mode(soc)
+                if (
+                    not forced
+                    and self._evse_mode_since is not None
+                    and new_evse_value is not None
+                    and new_evse_value != self._evse_value
+                ):
+                    new_evse_value = self._stable_evse_mode(soc, new_evse_value)
 
         if new_evse_value is None:
             _LOGGER.warning("Cannot define expected EVSE state")
             return  # nothing to do
 
+        if self._evse_mode_since is None:
+            self._evse_mode_since = dt_util.utcnow()
+
         if self._evse_value is None or self._evse_value != new_evse_value:
             # we need to change charger setting
             _LOGGER.info(
@@ -472,6 +848,7 @@ class SLXChargingManager:
                 self._evse_value,
             )
             self._evse_value = new_evse_value
+            self._evse_mode_since = dt_util.utcnow()
             self.request_evse_set(new_evse_value)
         else:
             _LOGGER.debug("EVSE state didn't change %s", new_evse_value)
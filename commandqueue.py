@@ -0,0 +1,116 @@
+""" module for SlxCommandQueue """
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+import asyncio
+import logging
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SlxCommand:
+    """Single service call waiting in the queue"""
+
+    __slots__ = ("domain", "service", "data", "future")
+
+    def __init__(
+        self,
+        domain: str,
+        service: str,
+        data: dict[str, Any],
+        future: asyncio.Future[bool],
+    ):
+        self.domain = domain
+        self.service = service
+        self.data = data
+        self.future = future
+
+
+class SlxCommandQueue:
+    """Sends service calls to external devices using hass.services.async_call.
+
+    Each device has own queue drained by a single task - commands sent to the same
+    device are delivered in order (next one starts when previous one completed),
+    commands sent to different devices are delivered concurrently.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._queues: dict[str, deque[SlxCommand]] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+
+    def send(
+        self, device: str, domain: str, service: str, data: dict[str, Any]
+    ) -> asyncio.Future[bool]:
+        """Queue service call for the device.
+
+        Returns future which is resolved with True when service call completed or
+        False when it failed.
+        """
+        future: asyncio.Future[bool] = self.hass.loop.create_future()
+        queue = self._queues.setdefault(device, deque())
+        queue.append(SlxCommand(domain, service, data, future))
+        worker = self._workers.get(device)
+        if worker is None or worker.done():
+            # worker must be registered before it starts draining the queue
+            self._workers[device] = self.hass.async_create_task(
+                self._async_drain(device), eager_start=False
+            )
+        return future
+
+    async def async_send(
+        self, device: str, domain: str, service: str, data: dict[str, Any]
+    ) -> bool:
+        """Queue service call for the device and wait until it is completed"""
+        return await self.send(device, domain, service, data)
+
+    async def _async_drain(self, device: str) -> None:
+        queue = self._queues[device]
+        try:
+            while queue:
+                # command stays in the queue until completed, so cleanup can resolve it
+                command = queue[0]
+                result: bool = True
+                try:
+                    await self.hass.services.async_call(
+                        command.domain, command.service, command.data, blocking=True
+                    )
+                except (HomeAssistantError, vol.Invalid) as err:
+                    _LOGGER.warning(
+                        "Command %s.%s for %s failed: %s",
+                        command.domain,
+                        command.service,
+                        device,
+                        err,
+                    )
+                    result = False
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception(
+                        "Unexpected error in command %s.%s for %s",
+                        command.domain,
+                        command.service,
+                        device,
+                    )
+                    result = False
+                queue.popleft()
+                if not command.future.done():
+                    command.future.set_result(result)
+        finally:
+            self._workers.pop(device, None)
+
+    def cleanup(self) -> None:
+        """Cancel all commands which were not sent yet"""
+        for worker in self._workers.values():
+            worker.cancel()
+        for queue in self._queues.values():
+            for command in queue:
+                if not command.future.done():
+                    command.future.set_result(False)
+            queue.clear()
@@ -57,6 +57,11 @@ from .const import (
     CONF_EVSE_PLUG_CONNECTED,
     CONF_CAR_SOC_LEVEL,
     CONF_CAR_SOC_UPDATE_TIME,
+    CONF_GRID_POWER,
+    CONF_GRID_VOLTAGE,
+    DEFAULT_GRID_VOLTAGE,
+    CONF_CHARGER_PHASES,
+    DEFAULT_CHARGER_PHASES,
 )
 
 import json
@@ -385,6 +390,45 @@ class SLXConfigFlow:
         fields[
             vol.Required(CONF_BATTERY_CAPACITY, default=current_battery_capacity)
         ] = BATTERY_SELECTOR
+
+        # grid power is used for modulating charging current in PV charging mode
+        list_of_power = SLXConfigHelper.find_entities_of_unit(hass, {"W", "kW"})
+        current_grid_power = ""
+        if config_entry is not None:
+            current_grid_power = config_entry.options.get(CONF_GRID_POWER, "")
+
+        fields[
+            vol.Optional(
+                CONF_GRID_POWER,
+                description={"suggested_value": current_grid_power},
+            )
+        ] = SLXConfigHelper.build_selector(list_of_power)
+
+        # voltage and phases translate grid power into charging current
+        current_grid_voltage = DEFAULT_GRID_VOLTAGE
+        current_charger_phases = DEFAULT_CHARGER_PHASES
+        if config_entry is not None:
+            current_grid_voltage = config_entry.options.get(
+                CONF_GRID_VOLTAGE, DEFAULT_GRID_VOLTAGE
+            )
+            current_charger_phases = config_entry.options.get(
+                CONF_CHARGER_PHASES, DEFAULT_CHARGER_PHASES
+            )
+
+        fields[vol.Optional(CONF_GRID_VOLTAGE, default=current_grid_voltage)] = vol.All(
+            NumberSelector(
+                NumberSelectorConfig(mode=NumberSelectorMode.BOX, min=100, max=400)
+            ),
+            vol.Coerce(int),
+        )
+        fields[
+            vol.Optional(CONF_CHARGER_PHASES, default=current_charger_phases)
+        ] = vol.All(
+            NumberSelector(
+                NumberSelectorConfig(mode=NumberSelectorMode.BOX, min=1, max=3)
+            ),
+            vol.Coerce(int),
+        )
         return vol.Schema(fields)
 
     @staticmethod
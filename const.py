@@ -14,8 +14,16 @@ CONF_EVSE_PLUG_CONNECTED: str = "evse_plug_connected"
 CONF_CAR_SOC_LEVEL: str = "car_soc_level"
 CONF_CAR_SOC_UPDATE_TIME: str = "car_soc_update_time"
 
+CONF_GRID_POWER: str = "grid_power"
+CONF_GRID_VOLTAGE: str = "grid_voltage"
+DEFAULT_GRID_VOLTAGE: int = 230
+CONF_CHARGER_PHASES: str = "charger_phases"
+DEFAULT_CHARGER_PHASES: int = 1
+
 ## Configuration - not modified in user's config flow.
 DEFAULT_SCAN_INTERVAL: int = 10
+# entities are updated from coordinator at most that many times per second
+MAX_ENTITY_UPDATES_PER_SECOND: float = 1.0
 
 # Entities - sensor
 BATTERY_ENERGY_ESTIMATION = "bat_energy_estimated"
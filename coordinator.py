@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from datetime import timedelta, datetime
 
+import contextlib
 import logging
 import asyncio
 
@@ -25,6 +26,7 @@ from homeassistant.core import (
 
 from .const import (
     DEFAULT_SCAN_INTERVAL,
+    MAX_ENTITY_UPDATES_PER_SECOND,
     CONF_CHARGER_TYPE,
     CONF_EVSE_SESSION_ENERGY,
     CONF_EVSE_PLUG_CONNECTED,
@@ -32,6 +34,11 @@ from .const import (
     CONF_CAR_SOC_LEVEL,
     CONF_CAR_SOC_UPDATE_TIME,
     CONF_BATTERY_CAPACITY,
+    CONF_GRID_POWER,
+    CONF_GRID_VOLTAGE,
+    DEFAULT_GRID_VOLTAGE,
+    CONF_CHARGER_PHASES,
+    DEFAULT_CHARGER_PHASES,
     DOMAIN,
     ENT_CHARGE_MODE,
     ENT_CHARGE_METHOD,
@@ -41,11 +48,17 @@ from .const import (
     ENT_SOC_LIMIT_MIN,
     ENT_SOC_LIMIT_MAX,
     ENT_SOC_TARGET,
+    CHR_MODE_PVCHARGE,
     CHARGER_MODES,
 )
 
 from .chargingmanager import SLXChargingManager
 from .timer import SlxTimer
+from .governor import SlxRequestGovernor
+from .commandqueue import SlxCommandQueue
+from .dispatcher import SlxEventDispatcher
+from .energyunit import SlxEnergyNormalizer
+from .pvcontroller import SlxPvCurrentController
 from .slxopenevse import SLXOpenEvse
 from .slxevsemanual import SLXManualEvse
 from .slxcar import SLXCar
@@ -54,6 +67,7 @@ from .slxbmw import SLXBmw
 from .slxcarmanual import SLXCarManual
 from .slxtripplanner import SLXTripPlanner
 
+from homeassistant.components.recorder import get_instance, history
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.helpers import entity_registry
 from homeassistant.helpers.event import async_track_state_change_event
@@ -84,6 +98,21 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
             config_entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL) * 60
         )
 
+        # service calls to car and charger integrations, ordered per device
+        self.command_queue = SlxCommandQueue(self.hass)
+        # single state change listener for entities of car, charger and trip planner
+        self.dispatcher = SlxEventDispatcher(self.hass)
+
+        # updates pushed to entities are coalesced to limit state writes
+        self._data_update_interval = timedelta(
+            seconds=1 / MAX_ENTITY_UPDATES_PER_SECOND
+        )
+        self._last_data_update: datetime | None = None
+        self._data_update_pending: bool = False
+        self._timer_data_update = SlxTimer(
+            self.hass, self._data_update_interval, self.callback_data_update
+        )
+
         # First setup a car - as we will need a configuration from the car!
 
         ### Connect to Car integration
@@ -107,7 +136,7 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
                 CONF_CAR_SOC_UPDATE_TIME, None
             )
             if current_soc_level != "":
-                self.car = SLXCarManual(self.hass)
+                self.car = SLXCarManual(self.hass, self.dispatcher)
                 car_created = self.car.connect(
                     self.callback_soc_level,
                     current_soc_level,
@@ -142,6 +171,21 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
                 self.callback_soc_requested_retry,
             )
 
+        # shared budget for SOC requests sent to car's vendor service
+        self._soc_request: asyncio.Future[bool] | None = None
+        self._soc_request_governor = SlxRequestGovernor(
+            capacity=self.car_config[SLXCar.CONF_SOC_REQUEST_BUDGET],
+            refill_time=timedelta(
+                seconds=self.car_config[SLXCar.CONF_SOC_REQUEST_REFILL]
+            ),
+            backoff_initial=timedelta(seconds=soc_update_retry_time),
+            backoff_max=timedelta(
+                seconds=self.car_config[SLXCar.CONF_SOC_UPDATE_RETRY_MAX]
+            ),
+            failure_threshold=self.car_config[SLXCar.CONF_SOC_BREAKER_FAILURES],
+            open_time=timedelta(seconds=self.car_config[SLXCar.CONF_SOC_BREAKER_TIME]),
+        )
+
         # Setup charging manager
 
         self.charging_manager = SLXChargingManager(self.hass, self.car_config)
@@ -156,6 +200,8 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
 
         ### Connect to EVSE
         self.evse = None
+        # session energy unit is resolved once, not on every energy event
+        self._session_energy_normalizer = SlxEnergyNormalizer()
         charger_config = config_entry.options.get(CONF_CHARGER_TYPE, "")
         evse_configured: bool = self.create_auto_evse(charger_config)
 
@@ -163,6 +209,14 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
 
         if evse_configured is False:
             evse_configured = self.create_manual_evse(config_entry)
+        if self.evse is not None:
+            self._session_energy_normalizer.entity_id = (
+                self.evse.session_energy_entity()
+            )
+
+        self.pv_controller: SlxPvCurrentController | None = None
+        self._unsub_grid_power = None
+        self.create_pv_controller(config_entry)
         ################### Continue configuration
 
         # I need to initialize data after parent class.
@@ -180,15 +234,141 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
         self.charging_manager.target_soc = self.data[ENT_SOC_TARGET]
         self.charging_manager.charge_method = self.data[ENT_CHARGE_METHOD]
 
+        # reading recorder history can take long, session is restored when ready
+        self._restore_task = self.hass.async_create_background_task(
+            self.async_restore_session(), "slxchargingcontroller_restore_session"
+        )
+
         odometer_entity = self.car.odometer_entity()
-        self.trip_planner = SLXTripPlanner(self.hass)
+        self.trip_planner = SLXTripPlanner(self.hass, self.dispatcher)
 
         if odometer_entity is not None:
-            await self.trip_planner.initialize(odometer_entity)
+            # reading odometer history can take long, calendar is filled when ready
+            self.trip_planner.start_warmup(odometer_entity)
 
     def cleanup(self):
         if self.charging_manager is not None:
             self.charging_manager.cleanup()
+        if self.pv_controller is not None:
+            self.pv_controller.cleanup()
+        if self.evse is not None:
+            self.evse.cleanup()
+        if self._unsub_grid_power is not None:
+            self._unsub_grid_power()
+            self._unsub_grid_power = None
+        # results of pending requests are ignored
+        self._soc_request = None
+        self._cancel_soc_request_retry()
+        self.command_queue.cleanup()
+        self._timer_data_update.cancel_timer()
+        if self._restore_task is not None:
+            self._restore_task.cancel()
+            self._restore_task = None
+        if self.trip_planner is not None:
+            self.trip_planner.cancel_warmup()
+        self.dispatcher.cleanup()
+
+    async def _get_session_history(
+        self, start_time: datetime, end_time: datetime, entity_ids: list[str]
+    ) -> dict[str, list[State]]:
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.info("Recorder isn't available, charging session won't be restored")
+            return {}
+        return await get_instance(self.hass).async_add_executor_job(
+            history.get_significant_states,
+            self.hass,
+            start_time,
+            end_time,
+            entity_ids,
+            None,
+            True,
+            True,
+        )
+
+    async def async_restore_session(self) -> None:
+        """Rebuild charging session from recorder history when plug is connected at startup.
+
+        Reading session energy and SOC history avoids requesting SOC (and waking up the car) after HA restart.
+        """
+        if self.evse is None:
+            return
+        plug_entity = self.evse.plug_entity()
+        energy_entity = self.evse.session_energy_entity()
+        if plug_entity is None or energy_entity is None:
+            return
+        if self.extract_bool_state(self.hass.states.get(plug_entity)) is not True:
+            return
+
+        soc_level_entity: str | None = None
+        soc_update_entity: str | None = None
+        if self.car is not None:
+            soc_level_entity = self.car.soc_level_entity
+            if self._delay_soc_update:
+                soc_update_entity = self.car.soc_update_entity
+        entity_ids = [
+            entity_id
+            for entity_id in (
+                plug_entity,
+                energy_entity,
+                soc_level_entity,
+                soc_update_entity,
+            )
+            if entity_id is not None
+        ]
+
+        time_now = dt_util.utcnow()
+        start_time = time_now - timedelta(
+            seconds=self.car_config[SLXCar.CONF_SOC_AFTER_ENERGY]
+        )
+        states = await self._get_session_history(start_time, time_now, entity_ids)
+
+        if self.charging_manager.charging_active:
+            _LOGGER.debug("Plug connection was handled before history was read")
+            return
+
+        # find when plug was connected
+        plug_time: datetime | None = None
+        plugged: bool = False
+        for state in states.get(plug_entity, []):
+            plug_value = self.extract_bool_state(state)
+            if plug_value is True and plugged is False:
+                plug_time = state.last_changed
+            plugged = plug_value is True
+        if plug_time is None:
+            plug_time = start_time
+
+        # unit of energy entity is resolved once for the whole history
+        normalizer = SlxEnergyNormalizer(energy_entity)
+        energy_entries: list[tuple[datetime, float]] = [
+            (state.last_changed, normalizer.normalize(state))
+            for state in states.get(energy_entity, [])
+            if state.last_changed >= plug_time
+        ]
+
+        soc_level: float | None = None
+        soc_update: datetime | None = None
+        for state in states.get(soc_level_entity, []):
+            with contextlib.suppress(ValueError):
+                soc_level = float(state.state)
+                soc_update = state.last_changed
+        if soc_update_entity is not None:
+            soc_update = None
+            for state in states.get(soc_update_entity, []):
+                with contextlib.suppress(ValueError, TypeError):
+                    soc_update = dt_util.as_utc(dt_util.parse_datetime(state.state))
+
+        if soc_level is not None and soc_update is not None:
+            self._received_soc_level = soc_level
+            self._received_soc_update = soc_update
+
+        _LOGGER.info(
+            "Restoring charging session: plug connected %s, %d energy entries, SOC %s at %s",
+            plug_time,
+            len(energy_entries),
+            soc_level,
+            soc_update,
+        )
+        self.charging_manager.restore_session(energy_entries, soc_level, soc_update)
 
     def create_auto_evse(self, configuration: str) -> bool:
         if configuration == "manual":
@@ -209,9 +389,7 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
 
         # double check if OpenEVSE with that deviceID exists
         if SLXOpenEvse.check_all_entities(self.hass, device_id) is True:
-            self.evse = SLXOpenEvse(
-                self.hass,
-            )
+            self.evse = SLXOpenEvse(self.hass, self.command_queue, self.dispatcher)
             return self.evse.connect(
                 cb_sessionenergy=self.callback_charger_session_energy,
                 cb_plug=self.callback_charger_plug_connected,
@@ -241,7 +419,7 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
             current_evse_energy,
             current_evse_plug_connected,
         )
-        self.evse = SLXManualEvse(self.hass)
+        self.evse = SLXManualEvse(self.hass, self.dispatcher)
         successful_connect = self.evse.connect(
             self.callback_charger_session_energy,
             current_evse_energy,
@@ -250,6 +428,42 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
         )
         return successful_connect
 
+    def create_pv_controller(self, config_entry: ConfigEntry) -> bool:
+        grid_power_entity = config_entry.options.get(CONF_GRID_POWER, "")
+        if grid_power_entity == "":
+            return False
+        if self.evse is None or self.evse.can_control_current() is False:
+            _LOGGER.warning(
+                "Grid power %s is configured but EVSE cannot control charging current",
+                grid_power_entity,
+            )
+            return False
+
+        _LOGGER.info(
+            "Creating PV current control with grid power %s", grid_power_entity
+        )
+        self.pv_controller = SlxPvCurrentController(
+            self.hass,
+            self.evse.set_max_current,
+            voltage=config_entry.options.get(CONF_GRID_VOLTAGE, DEFAULT_GRID_VOLTAGE),
+            phases=config_entry.options.get(
+                CONF_CHARGER_PHASES, DEFAULT_CHARGER_PHASES
+            ),
+            deadband=self.car_config[SLXCar.CONF_PV_DEADBAND],
+            max_step=self.car_config[SLXCar.CONF_PV_CURRENT_STEP],
+            min_interval=timedelta(
+                seconds=self.car_config[SLXCar.CONF_PV_UPDATE_INTERVAL]
+            ),
+            pause_time=timedelta(seconds=self.car_config[SLXCar.CONF_PV_PAUSE_TIME]),
+            set_paused=self.evse.pause_charging,
+            release_current=self.evse.release_max_current,
+        )
+        self.evse.current_control = True
+        self._unsub_grid_power = self.dispatcher.subscribe(
+            grid_power_entity, self.callback_grid_power
+        )
+        return True
+
     def create_auto_car(self, configuration: str) -> bool:
         if configuration == "manual":
             return False
@@ -266,9 +480,9 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
 
         match integration_name:
             case "kia_hyundai":
-                tmp_car = SLXKiaHyundai(self.hass)
+                tmp_car = SLXKiaHyundai(self.hass, self.command_queue, self.dispatcher)
             case "bmw":
-                tmp_car = SLXBmw(self.hass)
+                tmp_car = SLXBmw(self.hass, self.command_queue, self.dispatcher)
 
         if tmp_car is None:
             _LOGGER.error(
@@ -325,6 +539,14 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
         if self.evse is not None:
             self.evse.set_charger_mode(value)
             _LOGGER.info("Setting charger mode to %s", value)
+            if self.pv_controller is not None:
+                if value == CHR_MODE_PVCHARGE:
+                    # charger's own setting is restored when PV charging stops
+                    self.pv_controller.start(
+                        self.evse.get_max_current(), self.evse.max_current_options()
+                    )
+                else:
+                    self.pv_controller.stop()
         else:
             _LOGGER.error(
                 "There is no charger to control (tried chang value to %s)", value
@@ -338,17 +560,18 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
     @staticmethod
     def extract_energy_entity(event_new_state) -> float:
         """Translates state with energy into kWh"""
+        return SlxEnergyNormalizer().normalize(event_new_state)
+
+    @staticmethod
+    def extract_power_entity(event_new_state) -> float:
+        """Translates state with power into W"""
         try:
             value = float(event_new_state.state)
-        except ValueError:
-            value = None
-        try:
-            unit = event_new_state.attributes["unit_of_measurement"]
-        except Exception:  # pylint: disable=broad-except
-            unit = None
-        if value is not None and unit is not None:
-            if unit == "Wh":
-                value = value / 1000
+        except (ValueError, AttributeError):
+            return None
+        unit = event_new_state.attributes.get("unit_of_measurement")
+        if unit == "kW":
+            value = value * 1000
         return value
 
     @staticmethod
@@ -367,28 +590,93 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
     @callback
     def callback_energy_estimated(self, energy: float) -> None:
         """Callback used to inform that new battery energy is estimated"""
-        # Passed data is not used - so pass just a useless string
+        self.async_schedule_data_update()
+
+    @callback
+    def async_schedule_data_update(self) -> None:
+        """Push data to entities, updates coming faster than allowed are coalesced"""
+        if self._data_update_pending:
+            return
+        time_now = dt_util.utcnow()
+        if self._last_data_update is not None:
+            wait_time = self._last_data_update + self._data_update_interval - time_now
+            if wait_time > timedelta(0):
+                self._data_update_pending = True
+                self._timer_data_update.schedule_timer(wait_time)
+                return
+        self._last_data_update = time_now
         self.async_set_updated_data(self.data)
 
+    @callback
+    def callback_data_update(self, _) -> None:
+        self._data_update_pending = False
+        self.async_schedule_data_update()
+
     @callback
     def callback_soc_requested(self, request_counter: int = -1) -> None:
         _LOGGER.info("SOC Request number %d", request_counter)
         # TODO - now it is just hardcoded service. Later it should be set by configuration
 
-        if self.car is not None:
-            if self.car.request_soc_update() is False:
-                _LOGGER.warning("SOC Update service not found")
-                if request_counter != -1:
-                    _LOGGER.info("Schedule retry of SOC update")
-                    self._timer_soc_update_retry.schedule_timer()
-        else:
+        if self.car is None:
             _LOGGER.warning(
                 "Get request for SocUpdate but car's integration isn't setup"
             )
+            return
+
+        governor = self._soc_request_governor
+        if governor.allow_request() is False:
+            _LOGGER.warning(
+                "SOC request skipped (budget used or service failing, circuit %s)",
+                governor.state.value,
+            )
+            retry_time = governor.next_allowed()
+            if retry_time is not None:
+                # trial request completion schedules retry itself
+                self._schedule_soc_request_retry(retry_time)
+            return
+
+        result = self.car.request_soc_update()
+        if result is False:
+            _LOGGER.warning("SOC Update service not found")
+            self._schedule_soc_request_retry(governor.record_failure())
+        elif result is True:
+            governor.record_success()
+            self._cancel_soc_request_retry()
+        else:
+            # success or failure is known when vendor service call completed
+            self._soc_request = result
+            result.add_done_callback(self._soc_request_completed)
+
+    @callback
+    def _soc_request_completed(self, result: asyncio.Future[bool]) -> None:
+        if result is not self._soc_request:
+            # coordinator was cleaned up or request was replaced by next one
+            return
+        self._soc_request = None
+        governor = self._soc_request_governor
+        if not result.cancelled() and result.result() is True:
+            governor.record_success()
+            self._cancel_soc_request_retry()
+            return
+        _LOGGER.warning("SOC Update service failed")
+        self._schedule_soc_request_retry(governor.record_failure())
+
+    def _schedule_soc_request_retry(self, retry_time: timedelta) -> None:
+        if self._timer_soc_update_retry is None:
+            return
+        _LOGGER.info("Schedule retry of SOC update in %s", retry_time)
+        self._timer_soc_update_retry.schedule_timer(retry_time)
+
+    def _cancel_soc_request_retry(self) -> None:
+        if self._timer_soc_update_retry is not None:
+            self._timer_soc_update_retry.cancel_timer()
 
     # TODO workaround because SLXTimer is passing DateTime as parametrs - this should be made more elegant
     @callback
     def callback_soc_requested_retry(self, _) -> None:
+        if self.charging_manager.charging_active is False:
+            _LOGGER.debug("Plug disconnected, SOC update retry dropped")
+            return
         self.callback_soc_requested()
 
     @callback
@@ -406,14 +694,26 @@ class SLXChgCtrlUpdateCoordinator(DataUpdateCoordinator):
 
         if charger_mode in CHARGER_MODES:
             self.async_charger_select(charger_mode)
-            self.async_set_updated_data(self.data)
+            self.async_schedule_data_update()
 
     @callback
     def callback_charger_session_energy(self, event: Event) -> None:
-        value = self.extract_energy_entity(event.data["new_state"])
+        value = self._session_energy_normalizer.normalize(event.data["new_state"])
+        if value is None:
+            _LOGGER.warning(
+                "Callback - invalid charger session energy %s",
+                event.data["new_state"],
+            )
+            return
         _LOGGER.info("Callback - charger session energy changed %.3f", value)
         self.charging_manager.add_charger_energy(value, event.time_fired)
 
+    @callback
+    def callback_grid_power(self, event: Event) -> None:
+        value = self.extract_power_entity(event.data["new_state"])
+        _LOGGER.debug("Callback - grid power changed %s", value)
+        self.pv_controller.set_grid_power(value)
+
     @callback
     def callback_charger_plug_connected(self, event: Event) -> None:
         value = self.extract_bool_state(event.data["new_state"])
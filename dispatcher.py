@@ -0,0 +1,152 @@
+""" module for SlxEventDispatcher """
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+import logging
+import time
+
+from homeassistant.core import (
+    HomeAssistant,
+    CALLBACK_TYPE,
+    Event,
+    HassJob,
+    HassJobType,
+    callback,
+)
+from homeassistant.helpers.event import async_track_state_change_event
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SlxEventHandler:
+    """Handler of state changes of single entity together with its statistics"""
+
+    __slots__ = ("entity_id", "job", "name", "count", "total_time", "max_time")
+
+    def __init__(self, entity_id: str, action: Callable[[Event], Any], name: str):
+        self.entity_id = entity_id
+        self.job = HassJob(action, name)
+        self.name = name
+        self.count: int = 0
+        # time[s] spent in handler
+        self.total_time: float = 0.0
+        self.max_time: float = 0.0
+
+    def record(self, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+
+
+class SlxEventDispatcher:
+    """Single state change listener for all entities watched by the integration.
+
+    Events are routed by entity_id to registered handlers. Entities can be
+    subscribed at any time - the listener is then registered again with the
+    extended list of entities. Number of calls and time spent is counted per handler.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._handlers: dict[str, list[SlxEventHandler]] = {}
+        self._unsub_listener: CALLBACK_TYPE | None = None
+
+    def subscribe(
+        self,
+        entity_ids: str | Iterable[str],
+        action: Callable[[Event], Any],
+        name: str | None = None,
+    ) -> CALLBACK_TYPE:
+        """Route state changes of entities to action, returns unsubscribe function"""
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        if name is None:
+            name = getattr(action, "__qualname__", repr(action))
+
+        handlers: list[SlxEventHandler] = []
+        new_entity: bool = False
+        for entity_id in entity_ids:
+            handler = SlxEventHandler(entity_id, action, name)
+            handlers.append(handler)
+            if entity_id not in self._handlers:
+                self._handlers[entity_id] = []
+                new_entity = True
+            self._handlers[entity_id].append(handler)
+        if new_entity:
+            self._track_entities()
+
+        @callback
+        def unsubscribe() -> None:
+            removed_entity: bool = False
+            for handler in handlers:
+                entity_handlers = self._handlers.get(handler.entity_id)
+                if entity_handlers is None or handler not in entity_handlers:
+                    continue
+                entity_handlers.remove(handler)
+                if not entity_handlers:
+                    del self._handlers[handler.entity_id]
+                    removed_entity = True
+            if removed_entity:
+                self._track_entities()
+
+        return unsubscribe
+
+    def _track_entities(self) -> None:
+        if self._unsub_listener is not None:
+            self._unsub_listener()
+            self._unsub_listener = None
+        if self._handlers:
+            self._unsub_listener = async_track_state_change_event(
+                self.hass, list(self._handlers), self._async_dispatch
+            )
+
+    @callback
+    def _async_dispatch(self, event: Event) -> None:
+        handlers = self._handlers.get(event.data["entity_id"])
+        if handlers is None:
+            return
+        # handler may unsubscribe itself
+        for handler in tuple(handlers):
+            start = time.perf_counter()
+            if handler.job.job_type is HassJobType.Coroutinefunction:
+                self.hass.async_create_task(
+                    self._async_run_timed(handler, event, start)
+                )
+                continue
+            try:
+                self.hass.async_run_hass_job(handler.job, event)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error in state change handler %s", handler.name)
+            handler.record(time.perf_counter() - start)
+
+    async def _async_run_timed(
+        self, handler: SlxEventHandler, event: Event, start: float
+    ) -> None:
+        try:
+            await handler.job.target(event)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error in state change handler %s", handler.name)
+        handler.record(time.perf_counter() - start)
+
+    def statistics(self) -> dict[str, dict[str, float]]:
+        """Number of calls, total and maximum time[s] per handler name"""
+        output: dict[str, dict[str, float]] = {}
+        for handlers in self._handlers.values():
+            for handler in handlers:
+                stats = output.setdefault(
+                    handler.name, {"count": 0, "total_time": 0.0, "max_time": 0.0}
+                )
+                stats["count"] += handler.count
+                stats["total_time"] += handler.total_time
+                stats["max_time"] = max(stats["max_time"], handler.max_time)
+        return output
+
+    def cleanup(self) -> None:
+        """Remove listener and all handlers"""
+        if self._unsub_listener is not None:
+            self._unsub_listener()
+            self._unsub_listener = None
+        self._handlers.clear()
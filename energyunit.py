@@ -0,0 +1,65 @@
+""" module for SlxEnergyNormalizer """
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+import logging
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import State
+
+_LOGGER = logging.getLogger(__name__)
+
+# factor translating energy unit into kWh
+ENERGY_UNIT_FACTORS: dict[str | None, float] = {
+    "Wh": 0.001,
+    "kWh": 1.0,
+    "MWh": 1000.0,
+    None: 1.0,
+}
+
+INVALID_STATES = frozenset((STATE_UNAVAILABLE, STATE_UNKNOWN, ""))
+
+
+class SlxEnergyNormalizer:
+    """Translates states of single energy entity into kWh.
+
+    Conversion factor is found only when state attributes change. Home Assistant
+    keeps the same attributes object as long as attributes are not modified, so
+    for most of the states only the value is parsed.
+    """
+
+    __slots__ = ("entity_id", "_attributes", "_factor")
+
+    def __init__(self, entity_id: str | None = None):
+        self.entity_id = entity_id
+        self._attributes: Mapping[str, Any] | None = None
+        self._factor: float = 1.0
+
+    def _update_factor(self, attributes: Mapping[str, Any]) -> None:
+        self._attributes = attributes
+        unit = attributes.get("unit_of_measurement")
+        factor = ENERGY_UNIT_FACTORS.get(unit)
+        if factor is None:
+            _LOGGER.warning(
+                "Unsupported energy unit %s of %s, value treated as kWh",
+                unit,
+                self.entity_id,
+            )
+            factor = 1.0
+        self._factor = factor
+
+    def normalize(self, state: State | None) -> float | None:
+        """Energy in kWh or None if state doesn't have a valid value"""
+        if state is None:
+            return None
+        if state.attributes is not self._attributes:
+            self._update_factor(state.attributes)
+        state_value = state.state
+        if state_value in INVALID_STATES:
+            return None
+        try:
+            return float(state_value) * self._factor
+        except ValueError:
+            return None
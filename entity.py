@@ -1,6 +1,12 @@
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import DeviceInfo
 
+import homeassistant.util.dt as dt_util
+
 from .const import DOMAIN
 
 
@@ -10,6 +16,9 @@ class SlxChgCtrlEntity(CoordinatorEntity):
     def __init__(self, coordinator):
         """Initialize the base entity."""
         super().__init__(coordinator)
+        self._written_value: Any = None
+        self._value_written: bool = False
+        self._written_time: datetime | None = None
 
     @property
     def device_info(self):
@@ -19,3 +28,28 @@ class SlxChgCtrlEntity(CoordinatorEntity):
             model="SLX Charger Ctrl",
             name="Salix Charger Controller",
         )
+
+    def _displayed_value(self) -> Any:
+        """Value as presented to user, state is written only when it changes"""
+        return None
+
+    def _should_write(self, value: Any) -> bool:
+        return not self._value_written or value != self._written_value
+
+    def _write_suppressed(self, value: Any) -> None:
+        """Called when value isn't written, value can be written later"""
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        value = self._displayed_value()
+        if not self._should_write(value):
+            self._write_suppressed(value)
+            return
+        self._write_value(value)
+
+    def _write_value(self, value: Any) -> None:
+        self._written_value = value
+        self._value_written = True
+        self._written_time = dt_util.utcnow()
+        self.async_write_ha_state()
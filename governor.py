@@ -0,0 +1,144 @@
+""" module for SlxRequestGovernor """
+
+from datetime import datetime, timedelta
+from enum import Enum
+import logging
+import random
+
+import homeassistant.util.dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    """State of circuit breaker"""
+
+    closed = "CLOSED"  # requests are allowed
+    open = "OPEN"  # service is missing or failing, requests are blocked
+    half_open = "HALF_OPEN"  # single trial request is allowed
+
+
+class SlxRequestGovernor:
+    """Limits requests sent to vendor services.
+
+    Token bucket limits number of requests (capacity as burst, one token refilled
+    every refill_time). Failed requests are retried with exponential backoff with
+    jitter. After failure_threshold consecutive failures circuit breaker opens and
+    blocks requests for open_time, then a single trial request is allowed.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        refill_time: timedelta,
+        backoff_initial: timedelta,
+        backoff_max: timedelta,
+        failure_threshold: int,
+        open_time: timedelta,
+        jitter: float = 0.2,
+        rng: random.Random = None,
+    ):
+        self._capacity: int = capacity
+        self._refill_time: timedelta = refill_time
+        self._backoff_initial: timedelta = backoff_initial
+        self._backoff_max: timedelta = backoff_max
+        self._failure_threshold: int = failure_threshold
+        self._open_time: timedelta = open_time
+        self._jitter: float = jitter
+        self._rng = rng if rng is not None else random.Random()
+
+        self._tokens: float = capacity
+        self._last_refill: datetime = dt_util.utcnow()
+        self._failures: int = 0
+        self._state: CircuitState = CircuitState.closed
+        self._opened_at: datetime = None
+        self._trial_pending: bool = False
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state is CircuitState.open
+            and dt_util.utcnow() - self._opened_at >= self._open_time
+        ):
+            self._state = CircuitState.half_open
+            self._trial_pending = False
+            _LOGGER.info("Circuit breaker half-open, trial request allowed")
+        return self._state
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def _refill(self) -> None:
+        time_now = dt_util.utcnow()
+        elapsed = time_now - self._last_refill
+        self._last_refill = time_now
+        if self._refill_time.total_seconds() <= 0:
+            self._tokens = self._capacity
+            return
+        self._tokens = min(self._capacity, self._tokens + elapsed / self._refill_time)
+
+    def allow_request(self) -> bool:
+        """Check if request can be sent now. Consumes a token when allowed"""
+        state = self.state
+        if state is CircuitState.open:
+            _LOGGER.debug("Request blocked - circuit breaker open")
+            return False
+        if state is CircuitState.half_open and self._trial_pending:
+            _LOGGER.debug("Request blocked - waiting for trial request result")
+            return False
+
+        self._refill()
+        if self._tokens < 1:
+            _LOGGER.debug("Request blocked - no tokens left")
+            return False
+        self._tokens -= 1
+        if state is CircuitState.half_open:
+            self._trial_pending = True
+        return True
+
+    def next_allowed(self) -> timedelta | None:
+        """Returns time after which request could be allowed.
+
+        None if trial request is pending - its result decides about next request.
+        """
+        state = self.state
+        if state is CircuitState.half_open and self._trial_pending:
+            return None
+        if state is CircuitState.open:
+            return self._open_time - (dt_util.utcnow() - self._opened_at)
+        self._refill()
+        if self._tokens >= 1:
+            return timedelta(0)
+        return (1 - self._tokens) * self._refill_time
+
+    def record_success(self) -> None:
+        if self._failures > 0 or self._state is not CircuitState.closed:
+            _LOGGER.info("Request succeeded, circuit breaker closed")
+        self._failures = 0
+        self._state = CircuitState.closed
+        self._trial_pending = False
+
+    def record_failure(self) -> timedelta:
+        """Register failed request. Returns time to wait before retrying"""
+        self._failures += 1
+        if (
+            self._state is CircuitState.half_open
+            or self._failures >= self._failure_threshold
+        ):
+            if self._state is not CircuitState.open:
+                _LOGGER.warning(
+                    "Circuit breaker open after %d failed requests", self._failures
+                )
+            self._state = CircuitState.open
+            self._opened_at = dt_util.utcnow()
+            self._trial_pending = False
+            return self._open_time
+        return self.retry_delay()
+
+    def retry_delay(self) -> timedelta:
+        """Exponential backoff (based on consecutive failures) with jitter"""
+        exponent = min(max(self._failures - 1, 0), 16)
+        backoff = min(self._backoff_initial * (2**exponent), self._backoff_max)
+        return backoff * self._rng.uniform(1 - self._jitter, 1)
@@ -139,6 +139,9 @@ class SlxChgCtrlNumber(NumberEntity, SlxChgCtrlEntity):
             return float(state)
         return None
 
+    def _displayed_value(self) -> float | None:
+        return self.native_value
+
     async def async_set_native_value(self, value: float) -> None:
         coordinator: SLXChgCtrlUpdateCoordinator = self.coordinator
         try:
@@ -0,0 +1,213 @@
+""" module for SlxPvCurrentController """
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from datetime import datetime, timedelta
+import bisect
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+
+import homeassistant.util.dt as dt_util
+
+from .timer import SlxTimer
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SlxPvCurrentController:
+    """Modulates charging current so that charging follows PV surplus.
+
+    Grid power is positive when power is imported and negative when it is exported.
+    Target current is current setpoint reduced by grid power (so import lowers the
+    current and export raises it). Power changes smaller than deadband are ignored,
+    setpoint moves by at most max_step per update and updates are sent at most once
+    per min_interval. Current never goes below min_current - if power is still
+    imported at min_current for pause_time, charging is paused. It is resumed when
+    surplus allows charging with min_current for pause_time. When charger accepts
+    only some currents, setpoint is rounded down to the closest accepted one.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        set_current: Callable[[int], None],
+        min_current: int = 6,
+        max_current: int = 32,
+        voltage: float = 230.0,
+        phases: int = 1,
+        deadband: float = 100.0,
+        max_step: int = 2,
+        min_interval: timedelta = timedelta(seconds=15),
+        pause_time: timedelta = timedelta(minutes=5),
+        set_paused: Callable[[bool], None] | None = None,
+        release_current: Callable[[int], None] | None = None,
+    ):
+        self.hass = hass
+        self._set_current = set_current
+        self._set_paused = set_paused
+        # called with current restored on stop, current isn't controlled afterwards
+        self._release_current = (
+            release_current if release_current is not None else set_current
+        )
+        self.pause_time: timedelta = pause_time
+        self.min_current: int = min_current
+        self.max_current: int = max_current
+        self.deadband: float = deadband
+        self.max_step: int = max_step
+        self.min_interval: timedelta = min_interval
+        self._watts_per_amp: float = voltage * phases
+
+        self.active: bool = False
+        # charger's max current before PV control started, restored on stop
+        self.restore_current: int | None = None
+        # currents accepted by charger, empty if any current is accepted
+        self.options: list[int] = []
+        self.setpoint: int | None = None
+        self.grid_power: float | None = None
+        self._last_update: datetime | None = None
+        self.paused: bool = False
+        # since when pause (or resume) condition is met
+        self._pause_condition_since: datetime | None = None
+
+        self.timer_update = SlxTimer(hass, min_interval, self.callback_update)
+
+    def start(
+        self,
+        restore_current: int | None = None,
+        options: Sequence[int] | None = None,
+    ) -> None:
+        """Start tracking PV surplus, current ramps up from minimum.
+
+        restore_current is charger's max current set before PV control started,
+        options are currents accepted by charger.
+        """
+        if self.active:
+            return
+        _LOGGER.info(
+            "PV current control started, current %s restored on stop", restore_current
+        )
+        self.active = True
+        self.paused = False
+        self._pause_condition_since = None
+        self.restore_current = restore_current
+        self.options = sorted(options) if options else []
+        self._push_setpoint(self._limit(self.min_current))
+
+    def stop(self) -> None:
+        """Stop tracking PV surplus and restore charger's max current"""
+        if not self.active:
+            return
+        _LOGGER.info("PV current control stopped")
+        self.active = False
+        # charger mode set by coordinator replaces the pause
+        self.paused = False
+        self.timer_update.cancel_timer()
+        if self.restore_current is not None:
+            restore_current = self.restore_current
+        else:
+            restore_current = self._limit(self.max_current)
+        _LOGGER.debug("PV current control restores current %d", restore_current)
+        self.setpoint = restore_current
+        self._release_current(restore_current)
+
+    def cleanup(self) -> None:
+        self.active = False
+        self.timer_update.cancel_timer()
+
+    def set_grid_power(self, grid_power: float | None) -> None:
+        """New grid power reading [W]"""
+        self.grid_power = grid_power
+        if self.active:
+            self.update()
+
+    def target_current(self) -> int | None:
+        """Next setpoint after deadband, slew limit and current limits are applied"""
+        if self.grid_power is None or self.setpoint is None:
+            return None
+        if abs(self.grid_power) <= self.deadband:
+            return self.setpoint
+        # round towards lower current, so surplus isn't exceeded
+        change = int((-self.grid_power / self._watts_per_amp) // 1)
+        desired = self._limit(self.setpoint + change)
+        change = max(-self.max_step, min(self.max_step, change))
+        new_setpoint = self._limit(self.setpoint + change)
+        if new_setpoint == self.setpoint and desired != self.setpoint:
+            # accepted currents are further apart than max_step, move to next one
+            if desired > self.setpoint:
+                new_setpoint = self.options[
+                    bisect.bisect_right(self.options, self.setpoint)
+                ]
+            else:
+                new_setpoint = self.options[
+                    bisect.bisect_left(self.options, self.setpoint) - 1
+                ]
+        return new_setpoint
+
+    def _limit(self, current: int) -> int:
+        current = max(self.min_current, min(self.max_current, current))
+        if not self.options:
+            return current
+        index = bisect.bisect_right(self.options, current)
+        return self.options[max(index - 1, 0)]
+
+    def _update_pause(self, time_now: datetime) -> None:
+        """Pause after sustained import at minimum current, resume on surplus"""
+        if self.grid_power is None or self.setpoint is None:
+            return
+        if self.paused:
+            # charger doesn't draw power, so export is the whole surplus
+            condition = -self.grid_power >= self.min_current * self._watts_per_amp
+        else:
+            condition = (
+                self.setpoint <= self.min_current and self.grid_power > self.deadband
+            )
+        if not condition:
+            self._pause_condition_since = None
+            return
+        if self._pause_condition_since is None:
+            self._pause_condition_since = time_now
+            return
+        if time_now - self._pause_condition_since < self.pause_time:
+            return
+        self._pause_condition_since = None
+        self.paused = not self.paused
+        _LOGGER.info("PV charging %s", "paused" if self.paused else "resumed")
+        if self._set_paused is not None:
+            self._set_paused(self.paused)
+
+    def update(self) -> None:
+        time_now = dt_util.utcnow()
+        self._update_pause(time_now)
+        if self.paused:
+            # current stays at minimum, it is ramped up after charging is resumed
+            return
+        if self._last_update is not None:
+            wait_time = self._last_update + self.min_interval - time_now
+            if wait_time > timedelta(0):
+                # reading is used when rate limit allows next setpoint
+                if not self.timer_update.scheduled:
+                    self.timer_update.schedule_timer(wait_time)
+                return
+
+        new_setpoint = self.target_current()
+        if new_setpoint is None or new_setpoint == self.setpoint:
+            return
+        self._push_setpoint(new_setpoint)
+
+    @callback
+    def callback_update(self, _) -> None:
+        if self.active:
+            self.update()
+
+    def _push_setpoint(self, setpoint: int) -> None:
+        _LOGGER.debug(
+            "PV current setpoint %s -> %d (grid power %s W)",
+            self.setpoint,
+            setpoint,
+            self.grid_power,
+        )
+        self.setpoint = setpoint
+        self._last_update = dt_util.utcnow()
+        self._set_current(setpoint)
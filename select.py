@@ -102,6 +102,9 @@ class SlxChrCtrlSelect(SelectEntity, SlxChgCtrlEntity):
             return str(state)
         return None
 
+    def _displayed_value(self) -> str | None:
+        return self.current_option
+
     async def async_select_option(self, option: Any) -> None:
         coordinator: SLXChgCtrlUpdateCoordinator = self.coordinator
         try:
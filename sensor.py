@@ -5,8 +5,10 @@
 from __future__ import annotations
 
 from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
 import logging
-from typing import Final
+from typing import Any, Final
 
 
 from homeassistant.components.sensor import (
@@ -23,8 +25,11 @@ from homeassistant.const import (
 )
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+
+import homeassistant.util.dt as dt_util
 
 from .const import (
     DOMAIN,
@@ -44,24 +49,67 @@ _LOGGER = logging.getLogger(__name__)
 # sensors  types: https://developers.home-assistant.io/docs/core/entity/sensor/
 # mdi icons: https://pictogrammers.com/library/mdi/
 
-SENSOR_DESCRIPTIONS: Final[tuple[SensorEntityDescription, ...]] = (
-    SensorEntityDescription(
+
+@dataclass
+class SLXSensorEntityDescription(SensorEntityDescription):
+    """Extend default SensorEntityDescription with rules deciding which changes are reported.
+
+    Change is reported when it is at least significant_absolute or significant_relative
+    (fraction of previous value), smaller changes are reported after max_quiet_time.
+    Without rules every change is reported.
+    """
+
+    significant_absolute: float | None = None
+    significant_relative: float | None = None
+    max_quiet_time: timedelta | None = None
+
+    def significant_change(
+        self, old_value: Any, new_value: Any, quiet_time: timedelta
+    ) -> bool:
+        if old_value == new_value:
+            return False
+        if not isinstance(old_value, (int, float)) or not isinstance(
+            new_value, (int, float)
+        ):
+            return True
+        if self.significant_absolute is None and self.significant_relative is None:
+            return True
+        change = abs(new_value - old_value)
+        if (
+            self.significant_absolute is not None
+            and change >= self.significant_absolute
+        ):
+            return True
+        if (
+            self.significant_relative is not None
+            and change >= self.significant_relative * abs(old_value)
+        ):
+            return True
+        return self.max_quiet_time is not None and quiet_time >= self.max_quiet_time
+
+
+SENSOR_DESCRIPTIONS: Final[tuple[SLXSensorEntityDescription, ...]] = (
+    SLXSensorEntityDescription(
         key=BATTERY_ENERGY_ESTIMATION,
         name="Battery Energy Estimation",
         icon="mdi:lightning-bolt",
         device_class=SensorDeviceClass.ENERGY,
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         suggested_display_precision=2,
+        significant_relative=0.005,
+        max_quiet_time=timedelta(minutes=10),
     ),
-    SensorEntityDescription(
+    SLXSensorEntityDescription(
         key=BATTERY_SOC_ESTIMATION,
         name="Battery SOC Estimation",
         icon="mdi:battery-charging",
         device_class=SensorDeviceClass.BATTERY,
         native_unit_of_measurement=PERCENTAGE,
         suggested_display_precision=2,
+        significant_absolute=0.5,
+        max_quiet_time=timedelta(minutes=10),
     ),
-    SensorEntityDescription(
+    SLXSensorEntityDescription(
         key=CHARGING_SESSION_DURATION,
         name="Charging Session Duration",
         icon="mdi:battery-clock",
@@ -69,7 +117,7 @@ SENSOR_DESCRIPTIONS: Final[tuple[SensorEntityDescription, ...]] = (
         native_unit_of_measurement=UnitOfTime.MINUTES,
     ),
     # I cannot find a proper device and entity units (pure integer). Lets re-use percentage despite the fact that it can be a little bit confusing.
-    SensorEntityDescription(
+    SLXSensorEntityDescription(
         key=REQUEST_SOC_UPDATE,
         name="Request SOC Update",
         icon="mdi:battery-sync",
@@ -100,7 +148,7 @@ class SlxChgCtrlSensor(SensorEntity, SlxChgCtrlEntity):
     def __init__(
         self,
         coordinator: SLXChgCtrlUpdateCoordinator,
-        description: SensorEntityDescription,
+        description: SLXSensorEntityDescription,
     ) -> None:
         super().__init__(coordinator)
         self._description = description
@@ -111,6 +159,8 @@ class SlxChgCtrlSensor(SensorEntity, SlxChgCtrlEntity):
         self._attr_device_class = self._description.device_class
         self._attr_should_poll = False
         self._manager = coordinator.charging_manager
+        # trailing write of suppressed value after max_quiet_time
+        self._unsub_flush: CALLBACK_TYPE | None = None
         self._attr_suggested_display_precision = (
             self._description.suggested_display_precision
         )
@@ -135,13 +185,59 @@ class SlxChgCtrlSensor(SensorEntity, SlxChgCtrlEntity):
         """Return the unit the value was reported in by the sensor"""
         return self._description.native_unit_of_measurement
 
+    def _displayed_value(self):
+        """Value rounded to display precision"""
+        precision = self._attr_suggested_display_precision
+        if precision is not None and isinstance(self._attr_state, float):
+            return round(self._attr_state, precision)
+        return self._attr_state
+
+    def _should_write(self, value: Any) -> bool:
+        if not self._value_written:
+            return True
+        return self._description.significant_change(
+            self._written_value, value, dt_util.utcnow() - self._written_time
+        )
+
+    def _write_suppressed(self, value: Any) -> None:
+        """Write pending value after quiet time, even if no more updates come"""
+        max_quiet_time = self._description.max_quiet_time
+        if max_quiet_time is None or self._unsub_flush is not None:
+            return
+        if value == self._written_value:
+            return
+        wait_time = self._written_time + max_quiet_time - dt_util.utcnow()
+        self._unsub_flush = async_call_later(
+            self.hass, max(wait_time, timedelta(0)), self._callback_flush
+        )
+
+    @callback
+    def _callback_flush(self, _) -> None:
+        self._unsub_flush = None
+        value = self._displayed_value()
+        if value != self._written_value:
+            self._write_value(value)
+
+    def _write_value(self, value: Any) -> None:
+        self._cancel_flush()
+        super()._write_value(value)
+
+    def _cancel_flush(self) -> None:
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._cancel_flush()
+        await super().async_will_remove_from_hass()
+
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         attribute_name = f"_attr_{self._key}"
         if self._attr_available:
             self._attr_state = getattr(self._manager, attribute_name)
-            self.async_write_ha_state()
+            super()._handle_coordinator_update()
         else:
             _LOGGER.warning(
                 "Coordinator Update. Attribute: %s do not exist", attribute_name
@@ -21,6 +21,8 @@ from homeassistant.core import (
 )
 
 from .slxcar import SLXCar
+from .commandqueue import SlxCommandQueue
+from .dispatcher import SlxEventDispatcher
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,9 +45,14 @@ class SLXBmw(SLXCar):
         combined_list = [SLXBmw.WATCHED_ENTITIES]
         return combined_list
 
-    def __init__(self, hass: HomeAssistant):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        command_queue: SlxCommandQueue | None = None,
+        dispatcher: SlxEventDispatcher | None = None,
+    ):
         _LOGGER.info("Initialize SLXBMW")
-        super().__init__(hass)
+        super().__init__(hass, command_queue, dispatcher)
         self.dynamic_config[SLXCar.CONF_SOC_UPDATE_REQUIRED] = False
 
     def connect(
@@ -68,12 +75,10 @@ class SLXBmw(SLXCar):
         self.slugified_name = SLXCar._slugify_device_name(self.device_name)
         _LOGGER.info("Found BMW device : device_name %s", self.device_name)
 
-        self._subscribe_entity(
-            SLXCar._traslate_entity_name(
-                SLXBmw.WATCHED_ENTITIES["soclevel"], self.slugified_name
-            ),
-            cb_soc,
+        self.soc_level_entity = SLXCar._traslate_entity_name(
+            SLXBmw.WATCHED_ENTITIES["soclevel"], self.slugified_name
         )
+        self._subscribe_entity(self.soc_level_entity, cb_soc)
 
         super().connect()
 
@@ -81,7 +86,7 @@ class SLXBmw(SLXCar):
         _LOGGER.info("Disconnect")
         super().disconnect()
 
-    def request_soc_update(self) -> bool:
+    def request_soc_update(self) -> bool | asyncio.Future[bool]:
         UPDATE_SERVICE_DOMAIN = "homeassistant"
         UPDATE_SERVICE_REQUEST = "update_entity"
         entity_name = SLXCar._traslate_entity_name(
@@ -90,11 +95,10 @@ class SLXBmw(SLXCar):
         if self.hass.services.has_service(
             UPDATE_SERVICE_DOMAIN, UPDATE_SERVICE_REQUEST
         ):
-            self.hass.async_add_executor_job(
-                self.hass.services.call,
+            return self.command_queue.send(
+                self.device_id,
                 UPDATE_SERVICE_DOMAIN,
                 UPDATE_SERVICE_REQUEST,
                 {"entity_id": entity_name},
             )
-            return True
         return False
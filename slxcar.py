@@ -1,6 +1,5 @@
 """ slxmodule for car's integration base class"""
 
-from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers import entity_registry, device_registry
 from homeassistant.helpers.entity_registry import EntityRegistry
 from homeassistant.util import slugify
@@ -20,6 +19,9 @@ from homeassistant.core import (
     callback,
 )
 
+from .commandqueue import SlxCommandQueue
+from .dispatcher import SlxEventDispatcher
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -163,8 +165,8 @@ class SLXCar:
     def _subscribe_entity(
         self, entity_name: str, external_calback: Callable[[Event], Any]
     ) -> None:
-        self.unsub_dict[entity_name] = async_track_state_change_event(
-            self.hass, entity_name, external_calback
+        self.unsub_dict[entity_name] = self.dispatcher.subscribe(
+            entity_name, external_calback
         )
 
     # Configurations. Assume that all times are set in seconds.
@@ -173,31 +175,79 @@ class SLXCar:
     CONF_SOC_UPDATE_REQUIRED = "SOC_UPDATE_REQUIRED"  # True/False - does we need to subscribe for SOC Update time
     CONF_SOC_READING_DELAY = "SOC_READING_DELAY"  # time[s] how long after received SOC Update Time - we read SOC level. Only used if CONF_SOC_UPDATE_REQUIRED is True.
     CONF_SOC_UPDATE_RETRY = "SOC_UPDATE_RETRY"  # time[s] after which we retry "request_soc_update", if 0 or missing,  no retry is done
+    CONF_SOC_UPDATE_RETRY_MAX = "SOC_UPDATE_RETRY_MAX"  # time[s] maximum retry time - retry time doubles (with jitter) after each failed request
+    CONF_SOC_REQUEST_BUDGET = "SOC_REQUEST_BUDGET"  # number of SOC requests which can be sent in a burst
+    CONF_SOC_REQUEST_REFILL = "SOC_REQUEST_REFILL"  # time[s] after which one more SOC request is added to the budget
+    CONF_SOC_BREAKER_FAILURES = "SOC_BREAKER_FAILURES"  # number of consecutive failed SOC requests after which requests are blocked
+    CONF_SOC_BREAKER_TIME = "SOC_BREAKER_TIME"  # time[s] for which SOC requests are blocked, then single trial request is allowed
     # Used by charging manager
     CONF_SOC_REQUEST_TIMEOUT = "SOC_REQUEST_TIMEOUT"  # time[s] after which we treat that SOC isn't received and we switch to autopilot mode
     CONF_SOC_NEXT_UPDATE = (
         "SOC_NEXT_UPDATE"  # time[s] how often we request for checking SOC level
     )
+    CONF_SOC_MIN_NEXT_UPDATE = "SOC_MIN_NEXT_UPDATE"  # time[s] shortest time to next SOC check when it is planned from charging progress
+    CONF_SOC_MAX_NEXT_UPDATE = "SOC_MAX_NEXT_UPDATE"  # time[s] longest time to next SOC check when it is planned from charging progress
     CONF_SOC_BEFORE_ENERGY = "SOC_BEFORE_ENERGY"  # time[s] how long before plug connection and/or receiving session energy from EVSE, SOC level is treated as valid.
     CONF_SOC_AFTER_ENERGY = "SOC_AFTER_ENERGY"  # time[s] how long after last energy reading - received SOC can be treated as valid.
+    CONF_SESSION_HISTORY_LIMIT = "SESSION_HISTORY_LIMIT"  # number of session energy entries after which history is compacted
+    CONF_SESSION_HISTORY_TOLERANCE = "SESSION_HISTORY_TOLERANCE"  # energy[kWh] maximum interpolation error introduced by compacting history
+    CONF_SOC_HYSTERESIS = "SOC_HYSTERESIS"  # SOC[%] how far estimated SOC must cross a threshold before EVSE mode changes
+    CONF_MODE_MIN_DWELL = "MODE_MIN_DWELL"  # time[s] minimum time EVSE stays in a mode before SOC driven change, setting changes are not delayed
+    CONF_DECISION_DELAY = "DECISION_DELAY"  # time[s] in which setting changes are coalesced into one EVSE decision, if 0 decision is immediate
+    CONF_PV_DEADBAND = "PV_DEADBAND"  # power[W] grid power within which charging current isn't changed in PV charging
+    CONF_PV_CURRENT_STEP = "PV_CURRENT_STEP"  # current[A] maximum change of charging current in single PV charging update
+    CONF_PV_UPDATE_INTERVAL = "PV_UPDATE_INTERVAL"  # time[s] minimum time between charging current updates sent to EVSE
+    CONF_PV_PAUSE_TIME = "PV_PAUSE_TIME"  # time[s] of grid import at minimum current after which PV charging is paused (or surplus after which it is resumed)
 
-    def __init__(self, hass: HomeAssistant):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        command_queue: SlxCommandQueue | None = None,
+        dispatcher: SlxEventDispatcher | None = None,
+    ):
         self.hass = hass
+        # service calls sent to the car's integration
+        self.command_queue = (
+            command_queue if command_queue is not None else SlxCommandQueue(hass)
+        )
+        # state changes of car's entities
+        self.dispatcher = (
+            dispatcher if dispatcher is not None else SlxEventDispatcher(hass)
+        )
         self.unsub_dict: dict[str, Callable[[Event], Any]] = {}
         self.device_id = None
         self.device_name = None
         self.slugified_name = None
         self.connected: bool = False
+        # entities providing SOC level and SOC update time (set by connect)
+        self.soc_level_entity: str | None = None
+        self.soc_update_entity: str | None = None
         self.dynamic_config: dict[str, Any] = {
             SLXCar.CONF_SOC_UPDATE_REQUIRED: True,
             SLXCar.CONF_SOC_READING_DELAY: 20,
             SLXCar.CONF_SOC_UPDATE_RETRY: 60,
+            SLXCar.CONF_SOC_UPDATE_RETRY_MAX: 30 * 60,
+            SLXCar.CONF_SOC_REQUEST_BUDGET: 6,
+            SLXCar.CONF_SOC_REQUEST_REFILL: 20 * 60,
+            SLXCar.CONF_SOC_BREAKER_FAILURES: 5,
+            SLXCar.CONF_SOC_BREAKER_TIME: 60 * 60,
             SLXCar.CONF_SOC_REQUEST_TIMEOUT: 3 * 60,
             SLXCar.CONF_SOC_NEXT_UPDATE: 150 * 60,  # 2.5 h
+            SLXCar.CONF_SOC_MIN_NEXT_UPDATE: 10 * 60,
+            SLXCar.CONF_SOC_MAX_NEXT_UPDATE: 8 * 60 * 60,
             SLXCar.CONF_SOC_BEFORE_ENERGY: 15 * 60,  # 15 minutes
             SLXCar.CONF_SOC_AFTER_ENERGY: 48
             * 60
             * 60,  # up to 48 hours. In fact we need to handle a case in which session energy won't change because charging will be paused for few days!
+            SLXCar.CONF_SESSION_HISTORY_LIMIT: 2000,
+            SLXCar.CONF_SESSION_HISTORY_TOLERANCE: 0.01,
+            SLXCar.CONF_SOC_HYSTERESIS: 1.0,
+            SLXCar.CONF_MODE_MIN_DWELL: 5 * 60,
+            SLXCar.CONF_DECISION_DELAY: 2,
+            SLXCar.CONF_PV_DEADBAND: 100,
+            SLXCar.CONF_PV_CURRENT_STEP: 2,
+            SLXCar.CONF_PV_UPDATE_INTERVAL: 15,
+            SLXCar.CONF_PV_PAUSE_TIME: 5 * 60,
         }
 
     def connect(self) -> bool:
@@ -213,7 +263,12 @@ class SLXCar:
             _LOGGER.debug("Unsubscribing entity %s", entity_name)
             cancel()
 
-    def request_soc_update(self) -> bool:
+    def request_soc_update(self) -> bool | asyncio.Future[bool]:
+        """Request SOC update from car's service.
+
+        Returns False if service isn't available, otherwise future resolved with
+        result of service call (or True if request completed immediately).
+        """
         pass
 
     def odometer_entity(self) -> str | None:
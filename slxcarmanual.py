@@ -21,14 +21,17 @@ from homeassistant.core import (
 )
 
 from .slxcar import SLXCar
+from .dispatcher import SlxEventDispatcher
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class SLXCarManual(SLXCar):
-    def __init__(self, hass: HomeAssistant):
+    def __init__(
+        self, hass: HomeAssistant, dispatcher: SlxEventDispatcher | None = None
+    ):
         _LOGGER.info("Initialize SLXCarManual")
-        super().__init__(hass)
+        super().__init__(hass, dispatcher=dispatcher)
         # overwrite some config information
 
     def connect(
@@ -39,8 +42,10 @@ class SLXCarManual(SLXCar):
         entity_name_soc_update: str | None = None,
     ) -> bool:
         self._subscribe_entity(entity_name_soc, cb_soc)
+        self.soc_level_entity = entity_name_soc
         if cb_soc_update is not None and entity_name_soc_update is not None:
             self._subscribe_entity(entity_name_soc_update, cb_soc_update)
+            self.soc_update_entity = entity_name_soc_update
         super().connect()
         return True
 
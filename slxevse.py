@@ -1,6 +1,5 @@
 """ slxmodule for connecting with OpenEVSE"""
 
-from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers import entity_registry, device_registry
 from homeassistant.helpers.entity_registry import EntityRegistry
 from homeassistant.util import slugify
@@ -18,6 +17,9 @@ from homeassistant.core import (
     callback,
 )
 
+from .commandqueue import SlxCommandQueue
+from .dispatcher import SlxEventDispatcher
+
 from .const import (
     CHARGER_MODES,
     CHR_MODE_UNKNOWN,
@@ -35,20 +37,60 @@ class SLXEvse:
     def __init__(
         self,
         hass: HomeAssistant,
+        command_queue: SlxCommandQueue | None = None,
+        dispatcher: SlxEventDispatcher | None = None,
     ):
         self.hass = hass
+        # service calls sent to the device
+        self.command_queue = (
+            command_queue if command_queue is not None else SlxCommandQueue(hass)
+        )
+        # state changes of device's entities
+        self.dispatcher = (
+            dispatcher if dispatcher is not None else SlxEventDispatcher(hass)
+        )
         self.charge_mode: str = CHR_MODE_UNKNOWN
         self.unsub_dict: dict[str, Callable[[Event], Any]] = {}
         self.connected: bool = False
+        # charging current is modulated by controller instead of charger's own logic
+        self.current_control: bool = False
 
     def set_charger_mode(self, mode: str) -> None:
         _LOGGER.error("Setting charger mode is not defined")
 
+    def can_control_current(self) -> bool:
+        return False
+
+    def set_max_current(self, max_current: int) -> None:
+        _LOGGER.error("Setting max current is not defined")
+
+    def release_max_current(self, max_current: int) -> None:
+        """Set max current once, it isn't controlled afterwards"""
+        self.set_max_current(max_current)
+
+    def pause_charging(self, paused: bool) -> None:
+        _LOGGER.error("Pausing charging is not defined")
+
+    def get_max_current(self) -> int | None:
+        return None
+
+    def cleanup(self) -> None:
+        """Cancel pending work, called when integration is unloaded"""
+
+    def max_current_options(self) -> list[int]:
+        return []
+
+    def session_energy_entity(self) -> str | None:
+        return None
+
+    def plug_entity(self) -> str | None:
+        return None
+
     def _subscribe_entity(
         self, entity_name: str, external_calback: Callable[[Event], Any]
     ) -> None:
-        self.unsub_dict[entity_name] = async_track_state_change_event(
-            self.hass, entity_name, external_calback
+        self.unsub_dict[entity_name] = self.dispatcher.subscribe(
+            entity_name, external_calback
         )
 
     def connect(self) -> bool:
@@ -19,6 +19,7 @@ from homeassistant.core import (
 )
 
 from .slxevse import SLXEvse
+from .dispatcher import SlxEventDispatcher
 
 from .const import (
     CHARGER_MODES,
@@ -37,9 +38,10 @@ class SLXManualEvse(SLXEvse):
     def __init__(
         self,
         hass: HomeAssistant,
+        dispatcher: SlxEventDispatcher | None = None,
     ):
         _LOGGER.debug("SLXManualEvse")
-        super().__init__(hass)
+        super().__init__(hass, dispatcher=dispatcher)
 
     def connect(
         self,
@@ -54,6 +56,12 @@ class SLXManualEvse(SLXEvse):
         self._plug_name = plug_name
         return True
 
+    def session_energy_entity(self) -> str | None:
+        return self._session_energy_name
+
+    def plug_entity(self) -> str | None:
+        return self._plug_name
+
     def get_session_energy(self) -> float | None:
         entity_state = self.hass.states.get(self._session_energy_name)
         if entity_state is None:
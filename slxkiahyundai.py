@@ -22,6 +22,8 @@ from homeassistant.core import (
 )
 
 from .slxcar import SLXCar
+from .commandqueue import SlxCommandQueue
+from .dispatcher import SlxEventDispatcher
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -50,9 +52,14 @@ class SLXKiaHyundai(SLXCar):
         combined_list = [SLXKiaHyundai.WATCHED_ENTITIES]
         return combined_list
 
-    def __init__(self, hass: HomeAssistant):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        command_queue: SlxCommandQueue | None = None,
+        dispatcher: SlxEventDispatcher | None = None,
+    ):
         _LOGGER.info("Initialize SLXKiaHyundai")
-        super().__init__(hass)
+        super().__init__(hass, command_queue, dispatcher)
         # overwrite some config information
 
     def connect(
@@ -74,19 +81,15 @@ class SLXKiaHyundai(SLXCar):
         self.slugified_name = SLXCar._slugify_device_name(self.device_name)
         _LOGGER.info("Found Kia/Hyundai device : device_name %s", self.device_name)
 
-        self._subscribe_entity(
-            SLXCar._traslate_entity_name(
-                SLXKiaHyundai.WATCHED_ENTITIES["soclevel"], self.slugified_name
-            ),
-            cb_soc,
+        self.soc_level_entity = SLXCar._traslate_entity_name(
+            SLXKiaHyundai.WATCHED_ENTITIES["soclevel"], self.slugified_name
         )
+        self._subscribe_entity(self.soc_level_entity, cb_soc)
 
-        self._subscribe_entity(
-            SLXCar._traslate_entity_name(
-                SLXKiaHyundai.WATCHED_ENTITIES["soclastupdate"], self.slugified_name
-            ),
-            cb_soc_update,
+        self.soc_update_entity = SLXCar._traslate_entity_name(
+            SLXKiaHyundai.WATCHED_ENTITIES["soclastupdate"], self.slugified_name
         )
+        self._subscribe_entity(self.soc_update_entity, cb_soc_update)
         super().connect()
 
     async def disconnect(self) -> bool:
@@ -96,19 +99,18 @@ class SLXKiaHyundai(SLXCar):
             return True
         super().disconnect()
 
-    def request_soc_update(self) -> bool:
+    def request_soc_update(self) -> bool | asyncio.Future[bool]:
         # TODO - add checking if integration was connected
 
         if self.hass.services.has_service(
             SLXKiaHyundai.DOMAIN_NAME, SLXKiaHyundai.FORCE_UPDATE_SERVICE
         ):
-            self.hass.async_add_executor_job(
-                self.hass.services.call,
+            return self.command_queue.send(
+                self.device_id,
                 SLXKiaHyundai.DOMAIN_NAME,
                 SLXKiaHyundai.FORCE_UPDATE_SERVICE,
                 {},
             )
-            return True
         return False
 
     def odometer_entity(self) -> str | None:
@@ -1,12 +1,18 @@
 """ slxmodule for connecting with OpenEVSE"""
 
+from __future__ import annotations
+
 from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers import entity_registry, device_registry
 from homeassistant.helpers.entity_registry import EntityRegistry
 from homeassistant.util import slugify
 
+from datetime import timedelta
+import asyncio
 import logging
 
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any
 from enum import Enum
 
@@ -19,6 +25,9 @@ from homeassistant.core import (
 )
 
 from .slxevse import SLXEvse
+from .commandqueue import SlxCommandQueue
+from .dispatcher import SlxEventDispatcher
+from .timer import SlxTimer
 
 from .const import (
     CHARGER_MODES,
@@ -49,18 +58,194 @@ SetEntities = {
     "divertmode": "select.{devicename}_divert_mode",
 }
 
+# desired divert mode and override for each charger mode (override None - cleared)
+ModeDesiredState = {
+    CHR_MODE_STOPPED: ("fast", "disabled"),
+    CHR_MODE_PVCHARGE: ("eco", None),
+    CHR_MODE_NORMAL: ("fast", "active"),
+}
+
+# PV charging when current is modulated by SlxPvCurrentController
+ModeDesiredStateCurrentControl = {
+    **ModeDesiredState,
+    CHR_MODE_PVCHARGE: ("fast", "active"),
+}
+
 _LOGGER = logging.getLogger(__name__)
 
 
+class SlxOpenEvseReconciler:
+    """Holds desired OpenEVSE state and sends only commands missing to reach it.
+
+    Desired state is compared with observed entity states. Sent commands are
+    confirmed by state changes, if not confirmed within confirm_time missing
+    commands are sent again (up to max_attempts).
+    """
+
+    def __init__(
+        self,
+        evse: SLXOpenEvse,
+        confirm_time: timedelta = timedelta(seconds=30),
+        max_attempts: int = 3,
+    ):
+        self.evse = evse
+        self.max_attempts: int = max_attempts
+        self.attempts: int = 0
+
+        self.divert_mode: str | None = None
+        self.override: str | None = None
+        self.max_current: int | None = None
+        # max current is kept as desired state, otherwise it is set only once
+        self._keep_max_current: bool = True
+        # override confirmed by OpenEVSE service (switch shows only if override is set)
+        self._override_confirmed: str | None = None
+
+        self.timer_confirm = SlxTimer(
+            evse.hass, confirm_time, self.callback_confirm_timeout
+        )
+
+    def set_desired(
+        self,
+        divert_mode: str | None,
+        override: str | None,
+        max_current: int | None = None,
+    ) -> None:
+        """Set desired state and send missing commands. None keeps current value"""
+        self.divert_mode = divert_mode
+        self.override = override
+        if max_current is not None:
+            self.max_current = max_current
+        self.attempts = 0
+        self.reconcile()
+
+    def set_max_current(self, max_current: int, keep: bool = True) -> None:
+        """Set desired max current, if not kept it is forgotten once reached"""
+        self.max_current = max_current
+        self._keep_max_current = keep
+        self.attempts = 0
+        self.reconcile()
+
+    def _release_max_current(self) -> None:
+        if not self._keep_max_current:
+            _LOGGER.debug("Max current %s released", self.max_current)
+            self.max_current = None
+            self._keep_max_current = True
+
+    def _override_active(self) -> bool:
+        return self.evse._get_value_translated("manualoverride") == "on"
+
+    def missing_commands(self) -> list[str]:
+        """Returns names of values which differ from desired state"""
+        missing: list[str] = []
+        if (
+            self.divert_mode is not None
+            and self.evse._get_value_translated("divertmode") != self.divert_mode
+        ):
+            missing.append("divertmode")
+
+        if self.override is None:
+            if self._override_active():
+                missing.append("override")
+        elif not self._override_active() or self._override_confirmed != self.override:
+            missing.append("override")
+
+        if self.max_current is not None:
+            current = self.evse._get_value_translated("maxcurrent")
+            try:
+                if current is None or int(float(current)) != self.max_current:
+                    missing.append("maxcurrent")
+            except ValueError:
+                missing.append("maxcurrent")
+        return missing
+
+    def reconcile(self) -> None:
+        """Send commands which are needed to reach desired state"""
+        missing = self.missing_commands()
+        if "maxcurrent" not in missing:
+            self._release_max_current()
+        if not missing:
+            _LOGGER.debug("OpenEVSE in desired state")
+            self.timer_confirm.cancel_timer()
+            return
+
+        self.attempts += 1
+        _LOGGER.info("OpenEVSE commands %s, attempt %d", missing, self.attempts)
+        if "divertmode" in missing:
+            self.evse._select_option("divertmode", self.divert_mode)
+        if "override" in missing:
+            override = self.override
+            if override is None:
+                future = self.evse._clear_override()
+            else:
+                future = self.evse._activate_override(override == "active")
+            future.add_done_callback(
+                lambda result: self._override_completed(override, result)
+            )
+        if "maxcurrent" in missing:
+            self.evse._select_option("maxcurrent", str(self.max_current))
+        self.timer_confirm.schedule_timer()
+
+    def _override_completed(
+        self, override: str | None, result: asyncio.Future[bool]
+    ) -> None:
+        if not result.cancelled() and result.result() is True:
+            self._override_confirmed = override
+            self.check_confirmed()
+
+    def check_confirmed(self) -> None:
+        """Called when observed state changed, stops waiting if desired state is reached"""
+        missing = self.missing_commands()
+        if "maxcurrent" not in missing:
+            self._release_max_current()
+        if self.attempts > 0 and not missing:
+            _LOGGER.debug("OpenEVSE commands confirmed")
+            self.attempts = 0
+            self.timer_confirm.cancel_timer()
+
+    @callback
+    def callback_state_changed(self, _: Event) -> None:
+        self.check_confirmed()
+
+    @callback
+    def callback_confirm_timeout(self, _) -> None:
+        """Callback for SLXTimer - commands were not confirmed in time"""
+        if not self.missing_commands():
+            self.attempts = 0
+            return
+        if self.attempts >= self.max_attempts:
+            _LOGGER.error(
+                "OpenEVSE didn't reach desired state after %d attempts, missing %s",
+                self.attempts,
+                self.missing_commands(),
+            )
+            self.attempts = 0
+            self._release_max_current()
+            return
+        self.reconcile()
+
+    def cancel(self) -> None:
+        self.timer_confirm.cancel_timer()
+
+
 class SLXOpenEvse(SLXEvse):
     """Class for OpenEVSE connection"""
 
     def __init__(
         self,
         hass: HomeAssistant,
+        command_queue: SlxCommandQueue | None = None,
+        dispatcher: SlxEventDispatcher | None = None,
     ):
         _LOGGER.debug("SLXOpenEVSE")
-        super().__init__(hass)
+        super().__init__(hass, command_queue, dispatcher)
+        self.openevse_id: str | None = None
+        self.openevse_slugified_name: str | None = None
+        # value name -> entity_id, resolved once in connect
+        self._entity_ids: Mapping[str, str] = MappingProxyType({})
+        self._entity_names: Mapping[str, str] = MappingProxyType({})
+        # value name -> latest State, refreshed by state change events
+        self._states: dict[str, State | None] = {}
+        self.reconciler = SlxOpenEvseReconciler(self)
 
     def connect(
         self,
@@ -88,19 +273,19 @@ class SLXOpenEvse(SLXEvse):
             )
             return False
         else:
-            self._subscribe_entity(
-                SLXOpenEvse.__traslate_entity_name(
-                    WatchedEntities["sessionenergy"], self.openevse_slugified_name
-                ),
-                cb_sessionenergy,
-            )
-            self._subscribe_entity(
-                SLXOpenEvse.__traslate_entity_name(
-                    WatchedEntities["plug"], self.openevse_slugified_name
-                ),
-                cb_plug,
-            )
+            # state cache is subscribed first, so it is up to date in other callbacks
+            self._setup_entities()
+            self._subscribe_entity(self._entity_ids["sessionenergy"], cb_sessionenergy)
+            self._subscribe_entity(self._entity_ids["plug"], cb_plug)
+            # state changes confirming commands sent by reconciler
+            for name in ("divertmode", "manualoverride", "maxcurrent"):
+                self._subscribe_entity(
+                    self._entity_ids[name],
+                    self.reconciler.callback_state_changed,
+                )
+            self.connected = True
             _LOGGER.info("SLXOpenEVSE correctly initialized")
+            return True
 
     @staticmethod
     def __traslate_entity_name(template_name: str, openevse_slugified_name: str) -> str:
@@ -114,66 +299,67 @@ class SLXOpenEvse(SLXEvse):
             )
         return result
 
-    def _get_value_translated(self, name: str) -> Any:
-        translated_name: str | None = None
+    @staticmethod
+    def _build_entity_map(openevse_slugified_name: str) -> Mapping[str, str]:
+        """Translate all entity templates, watched entities have priority over set and get ones"""
+        entity_ids: dict[str, str] = {}
+        for templates in (GetEntities, SetEntities, WatchedEntities):
+            for name, template in templates.items():
+                entity_ids[name] = SLXOpenEvse.__traslate_entity_name(
+                    template, openevse_slugified_name
+                )
+        return MappingProxyType(entity_ids)
 
-        if name in GetEntities:
-            translated_name = SLXOpenEvse.__traslate_entity_name(
-                GetEntities[name], self.openevse_slugified_name
-            )
-        if name in SetEntities:
-            translated_name = SLXOpenEvse.__traslate_entity_name(
-                SetEntities[name], self.openevse_slugified_name
-            )
-        if name in WatchedEntities:
-            translated_name = SLXOpenEvse.__traslate_entity_name(
-                WatchedEntities[name], self.openevse_slugified_name
-            )
+    def _setup_entities(self) -> None:
+        """Resolve entity ids, read their states and keep them updated from events"""
+        self._entity_ids = SLXOpenEvse._build_entity_map(self.openevse_slugified_name)
+        self._entity_names = MappingProxyType(
+            {entity_id: name for name, entity_id in self._entity_ids.items()}
+        )
+        self._states = {
+            name: self.hass.states.get(entity_id)
+            for name, entity_id in self._entity_ids.items()
+        }
+        self.unsub_dict["state_cache"] = self.dispatcher.subscribe(
+            list(self._entity_names), self._callback_state_cache
+        )
 
-        if translated_name is None:
-            return None
+    @callback
+    def _callback_state_cache(self, event: Event) -> None:
+        name = self._entity_names.get(event.data["entity_id"])
+        if name is not None:
+            self._states[name] = event.data["new_state"]
+
+    def _translated_name(self, name: str) -> str | None:
+        return self._entity_ids.get(name)
 
-        entity_state = self.hass.states.get(translated_name)
+    def _get_value_translated(self, name: str) -> Any:
+        entity_state = self._states.get(name)
         if entity_state is None:
             return None
         return entity_state.state
 
     def _set_value_translated(self, name: str, value: Any) -> bool:
         if name in SetEntities:
-            translated_name = SLXOpenEvse.__traslate_entity_name(
-                SetEntities[name], self.openevse_slugified_name
-            )
-            self.hass.async_add_executor_job(
-                self.hass.states.set,
-                translated_name,
-                value,
-                {},
-            )
+            self.hass.states.async_set(self._entity_ids[name], value, {})
             return True
         else:
             return False
 
-    def _select_option(self, name: str, value: str) -> bool:
-        if name in SetEntities:
-            self.hass.async_add_executor_job(
-                self.hass.services.call,
+    def _select_option(self, name: str, value: str) -> asyncio.Future[bool] | None:
+        entity_name = self._translated_name(name)
+        if entity_name is not None and entity_name.startswith("select."):
+            _LOGGER.debug("_select_option %s to %s", name, value)
+            return self.command_queue.send(
+                self.openevse_id,
                 "select",
                 "select_option",
-                {
-                    "entity_id": SLXOpenEvse.__traslate_entity_name(
-                        SetEntities[name], self.openevse_slugified_name
-                    ),
-                    "option": value,
-                },
+                {"entity_id": entity_name, "option": value},
             )
-            _LOGGER.debug("_select_option %s to %s", name, value)
-            return True
-        else:
-            _LOGGER.warning("_select_option is invalid: %s", name)
-
-        return False
+        _LOGGER.warning("_select_option is invalid: %s", name)
+        return None
 
-    def _activate_override(self, charge: bool) -> bool:
+    def _activate_override(self, charge: bool) -> asyncio.Future[bool]:
         value_to_set: str = ""
         if charge:
             value_to_set = "active"
@@ -184,49 +370,87 @@ class SLXOpenEvse(SLXEvse):
             value_to_set,
             self.openevse_id,
         )
-        self.hass.async_add_executor_job(
-            self.hass.services.call,
+        return self.command_queue.send(
+            self.openevse_id,
             "openevse",
             "set_override",
             {"state": value_to_set, "device_id": [self.openevse_id]},
         )
 
-    def _clear_override(self) -> bool:
+    def _clear_override(self) -> asyncio.Future[bool]:
         _LOGGER.debug("_clear_override, device_id = %s", self.openevse_id)
-        self.hass.async_add_executor_job(
-            self.hass.services.call,
+        return self.command_queue.send(
+            self.openevse_id,
             "openevse",
             "clear_override",
             {"device_id": [self.openevse_id]},
         )
 
     def set_charger_mode(self, mode: str) -> None:
-        if not mode in CHARGER_MODES:
+        if not mode in CHARGER_MODES or mode not in ModeDesiredState:
             _LOGGER.warning("Invalid charing mode %s", mode)
             return
         _LOGGER.info("Set charger mode %s", mode)
 
-        if mode == self.charge_mode:
-            return
         self.charge_mode = mode
+        if self.current_control:
+            divert_mode, override = ModeDesiredStateCurrentControl[mode]
+        else:
+            divert_mode, override = ModeDesiredState[mode]
+        # reconciler sends only commands which are not reflected by OpenEVSE entities yet
+        self.reconciler.set_desired(divert_mode, override)
 
-        if self.charge_mode == CHR_MODE_STOPPED:
-            if self._get_value_translated("divertmode") != "fast":
-                self._select_option("divertmode", "fast")
-            self._activate_override(False)
-            return
+    def can_control_current(self) -> bool:
+        return True
 
-        if self.charge_mode == CHR_MODE_PVCHARGE:
-            if self._get_value_translated("divertmode") != "eco":
-                self._select_option("divertmode", "eco")
-            self._clear_override()
-            return
+    def set_max_current(self, max_current: int) -> None:
+        self.reconciler.set_max_current(max_current)
 
-        if self.charge_mode == CHR_MODE_NORMAL:
-            if self._get_value_translated("divertmode") != "fast":
-                self._select_option("divertmode", "fast")
-            self._activate_override(True)
+    def release_max_current(self, max_current: int) -> None:
+        # after max current is reached, user can change it without being overwritten
+        self.reconciler.set_max_current(max_current, keep=False)
+
+    def pause_charging(self, paused: bool) -> None:
+        if self.charge_mode != CHR_MODE_PVCHARGE:
             return
+        if paused:
+            divert_mode, override = ModeDesiredState[CHR_MODE_STOPPED]
+        else:
+            divert_mode, override = ModeDesiredStateCurrentControl[CHR_MODE_PVCHARGE]
+        _LOGGER.info("PV charging %s", "paused" if paused else "resumed")
+        self.reconciler.set_desired(divert_mode, override)
+
+    def cleanup(self) -> None:
+        self.reconciler.cancel()
+
+    def get_max_current(self) -> int | None:
+        current = self._get_value_translated("maxcurrent")
+        try:
+            return int(float(current))
+        except (TypeError, ValueError):
+            return None
+
+    def max_current_options(self) -> list[int]:
+        entity_state = self._states.get("maxcurrent")
+        if entity_state is None:
+            return []
+        options: list[int] = []
+        for option in entity_state.attributes.get("options", []):
+            try:
+                options.append(int(float(option)))
+            except (TypeError, ValueError):
+                _LOGGER.debug("Ignoring max current option %s", option)
+        return options
+
+    async def disconnect(self) -> bool:
+        self.reconciler.cancel()
+        return await super().disconnect()
+
+    def session_energy_entity(self) -> str | None:
+        return self._entity_ids.get("sessionenergy")
+
+    def plug_entity(self) -> str | None:
+        return self._entity_ids.get("plug")
 
     def get_session_energy(self) -> float | None:
         value_str = self._get_value_translated("sessionenergy")
@@ -2,22 +2,31 @@
 
 from __future__ import annotations
 
+from array import array
+import asyncio
 import bisect
-from collections import OrderedDict
+from collections.abc import Iterator, Mapping, Sequence
 import contextlib
 import csv
 from datetime import date, datetime, timedelta
+from enum import Enum
+from functools import partial
 import logging
 from typing import Any
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 from homeassistant.components.recorder import history, statistics
 from homeassistant.const import UnitOfLength
 from homeassistant.core import Callable, Event, HomeAssistant
 from homeassistant.helpers import storage
-from homeassistant.helpers.event import async_track_state_change_event
 import homeassistant.util.dt as dt_util
 
 from .const import ODOMETER_DAYS_BACK
+from .dispatcher import SlxEventDispatcher
 from .fileflag import (
     FLAG_CLEAR_STORAGE,
     FLAG_DIR,
@@ -31,19 +40,150 @@ _LOGGER = logging.getLogger(__name__)
 
 ODOMETER_STORAGE_KEY = "slxintegration_storage"
 
+# long-term statistics are read in chunks of that many days
+STATISTICS_CHUNK_DAYS = 31
+STATISTICS_END_OFFSET = timedelta(seconds=1)
+# entity history is read in pages of that many days
+HISTORY_PAGE_DAYS = 7
+
+
+def _daily_distances_python(
+    ordinals: Sequence[int],
+    readings: Sequence[float],
+    start_ordinal: int,
+    last_ordinal: int,
+) -> list[float]:
+    """Distance driven in each day start_ordinal+1..last_ordinal.
+
+    ordinals are days with readings (ordered), readings are their last odometer values.
+    First reading is the last one before the range, days without readings get 0.
+    """
+    distances = [0.0] * max(last_ordinal - start_ordinal, 0)
+    for index in range(1, len(ordinals)):
+        offset = ordinals[index] - start_ordinal - 1
+        if 0 <= offset < len(distances):
+            distances[offset] = readings[index] - readings[index - 1]
+    return distances
+
+
+def _daily_distances_numpy(
+    ordinals: Sequence[int],
+    readings: Sequence[float],
+    start_ordinal: int,
+    last_ordinal: int,
+) -> list[float]:
+    """Same as _daily_distances_python, differences are scattered onto dense days"""
+    distances = np.zeros(max(last_ordinal - start_ordinal, 0))
+    if len(ordinals) > 1:
+        offsets = np.asarray(ordinals[1:], dtype=np.int64) - (start_ordinal + 1)
+        differences = np.diff(np.asarray(readings, dtype=np.float64))
+        valid = (offsets >= 0) & (offsets < len(distances))
+        distances[offsets[valid]] = differences[valid]
+    return distances.tolist()
+
+
+daily_distances = _daily_distances_numpy if np is not None else _daily_distances_python
+
+
+class OdometerDayIndex(Mapping[date, int]):
+    """Position of the last odometer reading of each day, ordered by day.
+
+    Days are kept as ordinals in an array with parallel array of positions in
+    odometer list, lookups use bisect.
+    """
+
+    def __init__(self) -> None:
+        self._ordinals = array("l")
+        self._positions = array("l")
+
+    def find(self, day: date) -> int:
+        """Index of the day in the index or -1 if there is no reading that day"""
+        ordinal = day.toordinal()
+        index = bisect.bisect_left(self._ordinals, ordinal)
+        if index < len(self._ordinals) and self._ordinals[index] == ordinal:
+            return index
+        return -1
+
+    def bisect_left(self, day: date) -> int:
+        return bisect.bisect_left(self._ordinals, day.toordinal())
+
+    def day_at(self, index: int) -> date:
+        return date.fromordinal(self._ordinals[index])
+
+    def ordinal_at(self, index: int) -> int:
+        return self._ordinals[index]
+
+    def position_at(self, index: int) -> int:
+        return self._positions[index]
+
+    def ordinals(self, start: int, end: int) -> array:
+        return self._ordinals[start:end]
+
+    def positions(self, start: int, end: int) -> array:
+        return self._positions[start:end]
+
+    def set_position(self, day: date, position: int) -> None:
+        """Set last reading of the day, readings come mostly in order of days"""
+        ordinal = day.toordinal()
+        if self._ordinals and self._ordinals[-1] == ordinal:
+            self._positions[-1] = position
+        elif not self._ordinals or self._ordinals[-1] < ordinal:
+            self._ordinals.append(ordinal)
+            self._positions.append(position)
+        else:
+            index = self.find(day)
+            if index >= 0:
+                self._positions[index] = position
+            else:
+                index = bisect.bisect_left(self._ordinals, ordinal)
+                self._ordinals.insert(index, ordinal)
+                self._positions.insert(index, position)
+
+    def __getitem__(self, day: date) -> int:
+        index = self.find(day)
+        if index < 0:
+            raise KeyError(day)
+        return self._positions[index]
+
+    def __contains__(self, day: object) -> bool:
+        return isinstance(day, date) and self.find(day) >= 0
+
+    def __iter__(self) -> Iterator[date]:
+        return (date.fromordinal(ordinal) for ordinal in self._ordinals)
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+
+class PlannerState(Enum):
+    """Readiness of trip planner"""
+
+    idle = "IDLE"  # odometer processing isn't started
+    warming_up = "WARMING_UP"  # odometer is read from storage, statistics and history
+    ready = "READY"
+    failed = "FAILED"
+
+    def __str__(self) -> str:
+        return self.value
+
 
 class SLXTripPlanner:
     """Process odometer and estimate future trips."""
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def __init__(
+        self, hass: HomeAssistant, dispatcher: SlxEventDispatcher | None = None
+    ) -> None:
         """Create empty planner object.
 
         Does not run any data processing.
         """
         self.hass = hass
+        self.dispatcher = (
+            dispatcher if dispatcher is not None else SlxEventDispatcher(hass)
+        )
         self.unsub_dict: dict[str, Callable[[Event], Any]] = {}
         self.odometer_list: list[datetime, float] = []
-        self.odometer_index: OrderedDict[date, int] = {}
+        self.odometer_index = OdometerDayIndex()
         self.daily_histogram: list[list[float]] = []
         for weekday in range(7):
             self.daily_histogram.append(list())
@@ -54,17 +194,64 @@ class SLXTripPlanner:
 
         self.ha_config_path = hass.config.config_dir
         self.odometer_entity = None
+
+        self.state: PlannerState = PlannerState.idle
+        self._warmup_task: asyncio.Task | None = None
+        self._ready_listeners: list[Callable[[], None]] = []
         _LOGGER.info("HA Path:  %s", self.ha_config_path)
 
     async def initialize(self, odometer_entity: str):
         """Initialize processing of odometer input and subscribes for its changes."""
         self.odometer_entity = odometer_entity
+        self.state = PlannerState.warming_up
 
         await self.startup_capture_odometer()
         self._subscribe_entity(odometer_entity, self._callback_odometer_value)
+        self.state = PlannerState.ready
+
+    @property
+    def ready(self) -> bool:
+        return self.state is PlannerState.ready
+
+    def start_warmup(self, odometer_entity: str) -> asyncio.Task:
+        """Run initialize in background task, so it doesn't delay integration setup."""
+        self.state = PlannerState.warming_up
+        self._warmup_task = self.hass.async_create_background_task(
+            self._async_warmup(odometer_entity), "slxtripplanner_warmup"
+        )
+        return self._warmup_task
+
+    async def _async_warmup(self, odometer_entity: str) -> None:
+        try:
+            await self.initialize(odometer_entity)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Trip planner warmup failed")
+            self.state = PlannerState.failed
+            return
+        finally:
+            self._warmup_task = None
+        _LOGGER.info("Trip planner ready, %d odometer entries", len(self.odometer_list))
+        for listener in list(self._ready_listeners):
+            listener()
+
+    def add_ready_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call listener when background warmup finishes, returns remove function"""
+        self._ready_listeners.append(listener)
+
+        def remove_listener() -> None:
+            if listener in self._ready_listeners:
+                self._ready_listeners.remove(listener)
+
+        return remove_listener
+
+    def cancel_warmup(self) -> None:
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+            self._warmup_task = None
 
     async def disconnect(self) -> bool:
         """Use for tear down of the object."""
+        self.cancel_warmup()
         for entity_name, cancel in self.unsub_dict.items():
             _LOGGER.debug("Unsubscribing entity %s", entity_name)
             cancel()
@@ -87,55 +274,99 @@ class SLXTripPlanner:
     async def _get_statistics(
         self, start_time: datetime, end_time: datetime
     ) -> list[datetime, float]:
-        statistic_list = await self.hass.async_add_executor_job(
-            statistics.statistics_during_period,
-            self.hass,
-            start_time,
-            end_time,
-            [self.odometer_entity],
-            "hour",
-            {"distance": UnitOfLength.KILOMETERS},
-            {"state"},
-        )
+        """Read odometer from long-term statistics.
 
-        tmp_list: list[datetime, float] = []
+        Planner needs only the last reading of each day, so full days are read with
+        day resolution in month-long chunks read concurrently in executor. Current
+        day is read with 5 minute resolution.
+        """
+        recent_start = min(max(start_time, dt_util.start_of_local_day()), end_time)
+
+        # chunk boundaries are aligned to midnight, counting back from current day
+        periods: list[tuple[datetime, datetime, str]] = []
+        chunk_end = recent_start
+        while chunk_end > start_time:
+            chunk_start = max(
+                start_time, chunk_end - timedelta(days=STATISTICS_CHUNK_DAYS)
+            )
+            periods.insert(0, (chunk_start, chunk_end, "day"))
+            chunk_end = chunk_start
+        if recent_start < end_time:
+            periods.append((recent_start, end_time, "5minute"))
+
+        completed: int = 0
+
+        async def read_period(
+            period_start: datetime, period_end: datetime, period: str
+        ) -> list[datetime, float]:
+            nonlocal completed
+            statistic_list = await self.hass.async_add_executor_job(
+                statistics.statistics_during_period,
+                self.hass,
+                period_start,
+                period_end,
+                [self.odometer_entity],
+                period,
+                {"distance": UnitOfLength.KILOMETERS},
+                {"state"},
+            )
+            completed += 1
+            _LOGGER.debug(
+                "Read %s statistics %d/%d for %s: %s - %s",
+                period,
+                completed,
+                len(periods),
+                self.odometer_entity,
+                period_start,
+                period_end,
+            )
+            return self._statistics_to_odometer(
+                statistic_list.get(self.odometer_entity, [])
+            )
 
-        stats_list = statistic_list.get(self.odometer_entity, None)
-        if stats_list is None:
+        chunks = await asyncio.gather(*(read_period(*period) for period in periods))
+        tmp_list: list[datetime, float] = [entry for chunk in chunks for entry in chunk]
+
+        if len(tmp_list) == 0:
             _LOGGER.info(
                 "No long-term statistics for statistic_id = %s", self.odometer_entity
             )
             return tmp_list
-        found_stat_entries = len(stats_list)
-        first_entry_timestamp = stats_list[0].get("start", None)
-        if first_entry_timestamp is None:
-            first_entry_date = "N/A"
-        else:
-            first_entry_date = dt_util.utc_from_timestamp(first_entry_timestamp)
-        last_entry_timestamp = stats_list[-1].get("start", None)
-        if last_entry_timestamp is None:
-            last_entry_date = "N/A"
-        else:
-            last_entry_date = dt_util.utc_from_timestamp(last_entry_timestamp)
 
-        _LOGGER.warning(
-            "Captured stats for %s: Entries: %d, start: %s, end: %s",
+        _LOGGER.info(
+            "Captured stats for %s: Entries: %d (%d reads), start: %s, end: %s",
             self.odometer_entity,
-            found_stat_entries,
-            first_entry_date,
-            last_entry_date,
+            len(tmp_list),
+            len(periods),
+            tmp_list[0][0],
+            tmp_list[-1][0],
         )
+        return tmp_list
 
+    @staticmethod
+    def _statistics_to_odometer(
+        stats_list: list[dict[str, Any]]
+    ) -> list[datetime, float]:
+        """Translate statistics rows into (time, odometer) entries.
+
+        State is the odometer at the end of the period. It is stored one second before
+        period end, so it stays within the day it was read for.
+        """
+        tmp_list: list[datetime, float] = []
         for stats_entry in stats_list:
-            timestamp_str = stats_entry.get("start", None)
+            end_timestamp = stats_entry.get("end", None)
             odometer_str = stats_entry.get("state", None)
             odometer_value = None
             if odometer_str is not None:
-                with contextlib.suppress(ValueError):
+                with contextlib.suppress(ValueError, TypeError):
                     odometer_value = float(odometer_str)
-            if timestamp_str is not None and odometer_value is not None:
+            if end_timestamp is not None and odometer_value is not None:
                 tmp_list.append(
-                    (dt_util.utc_from_timestamp(timestamp_str), odometer_value)
+                    (
+                        dt_util.utc_from_timestamp(end_timestamp)
+                        - STATISTICS_END_OFFSET,
+                        odometer_value,
+                    )
                 )
         return tmp_list
 
@@ -144,30 +375,56 @@ class SLXTripPlanner:
     async def _get_historical_odometer(
         self, start_time: datetime, end_time: datetime
     ) -> list[(datetime, float)]:
+        """Read odometer from entity history.
+
+        Window is read page by page (HISTORY_PAGE_DAYS each) using compressed states
+        without attributes, each page is converted to odometer entries before the next
+        one is read, so memory use doesn't grow with the window.
+        """
         temp_list: list[(datetime, float)] = []
         _LOGGER.info("Process odometer, entity name = %s", self.odometer_entity)
 
-        events = await self.hass.async_add_executor_job(
-            history.get_significant_states,
-            self.hass,
-            start_time,
-            end_time,
-            [self.odometer_entity],
-            None,
-            True,
-            True,
-        )
-
-        if self.odometer_entity not in events.keys():
-            return temp_list
+        page_start = start_time
+        first_page: bool = True
+        while page_start < end_time:
+            page_end = min(page_start + timedelta(days=HISTORY_PAGE_DAYS), end_time)
+            events = await self.hass.async_add_executor_job(
+                partial(
+                    history.get_significant_states,
+                    self.hass,
+                    page_start,
+                    page_end,
+                    [self.odometer_entity],
+                    None,
+                    include_start_time_state=first_page,
+                    significant_changes_only=True,
+                    minimal_response=True,
+                    no_attributes=True,
+                    compressed_state_format=True,
+                )
+            )
+            self._append_compressed_states(
+                temp_list, events.get(self.odometer_entity, [])
+            )
+            del events
+            first_page = False
+            page_start = page_end
+        return temp_list
 
-        for event in events[self.odometer_entity]:
+    @staticmethod
+    def _append_compressed_states(
+        odometer_list: list[(datetime, float)], states: list[dict[str, Any]]
+    ) -> None:
+        """Add compressed states (s - state, lc/lu - last changed/updated timestamp)"""
+        for state in states:
             value_odometer = None
-            with contextlib.suppress(ValueError):
-                value_odometer = float(event.state)
-            if value_odometer is not None and event.last_changed is not None:
-                temp_list.append((event.last_changed, value_odometer))
-        return temp_list
+            with contextlib.suppress(ValueError, TypeError):
+                value_odometer = float(state["s"])
+            last_changed = state.get("lc", state.get("lu"))
+            if value_odometer is not None and last_changed is not None:
+                odometer_list.append(
+                    (dt_util.utc_from_timestamp(last_changed), value_odometer)
+                )
 
     ## storage operations
 
@@ -317,35 +574,25 @@ class SLXTripPlanner:
         self._append_odometer_list(self.odometer_list, odometer_list_history)
 
     def _recalculate_odometer_index(self):
-        keys = list(self.odometer_index.keys())
-
         first_new_index_value = 0
-        if keys:
-            # list is not empty
-            first_new_index_value = self.odometer_index[keys[-1]] + 1
+        if len(self.odometer_index) > 0:
+            first_new_index_value = self.odometer_index.position_at(-1) + 1
         # lets start processing..
 
-        odometer_entries_for_processing = self.odometer_list[first_new_index_value:]
-        for index, (odo_datetime, _) in enumerate(
-            odometer_entries_for_processing, first_new_index_value
-        ):
-            odo_date = odo_datetime.date()
-            self.odometer_index[odo_date] = index
+        for index in range(first_new_index_value, len(self.odometer_list)):
+            odo_date = self.odometer_list[index][0].date()
+            self.odometer_index.set_position(odo_date, index)
 
     def _get_day_distance_driven(self, day_to_calculate: date) -> float:
-        # it is quite inefficient. Don't use it to calculate some group statistics for a longer periods.
-        if day_to_calculate not in self.odometer_index:
-            return 0
-        keys = list(self.odometer_index.keys())
-        position_in_index_list = keys.index(day_to_calculate)
-        if position_in_index_list == 0:
-            # it's a first day - we can only calculate refering to previous one!
+        position_in_index_list = self.odometer_index.find(day_to_calculate)
+        if position_in_index_list <= 0:
+            # day without readings or a first day - we can only calculate refering to previous one!
             return 0
         odometer_current_day = self.odometer_list[
-            self.odometer_index[day_to_calculate]
+            self.odometer_index.position_at(position_in_index_list)
         ][1]
         odometer_previous_day = self.odometer_list[
-            self.odometer_index[keys[position_in_index_list - 1]]
+            self.odometer_index.position_at(position_in_index_list - 1)
         ][1]
         return odometer_current_day - odometer_previous_day
 
@@ -360,98 +607,90 @@ class SLXTripPlanner:
 
         Assumptions: odometer_index is updated.
         """
-        index_keys = list(self.odometer_index.keys())
-        if len(index_keys) < 2:
+        odometer_index = self.odometer_index
+        if len(odometer_index) < 2:
             # for sure we won't be able to calculate any day!
             # return empty list
             return []
 
-        first_possible_date: date = index_keys[0]
-        last_possible_date: date = index_keys[-2]
+        first_possible_date: date = odometer_index.day_at(0)
+        last_possible_date: date = odometer_index.day_at(-2)
 
         # TODO - start date is not the same as first day to process! We need to get one day back in out processing (how to do it?)
         if start_date is None:
-            first_day_to_process = first_possible_date
-            start_date = first_day_to_process + timedelta(days=1)
+            index = 0
+            start_date = first_possible_date + timedelta(days=1)
         else:
             # we need to find a day for processing which is before start_date.
-            index = bisect.bisect_left(index_keys, start_date)
+            index = odometer_index.bisect_left(start_date)
             if (
                 index > 0
             ):  # not always mathematically correct but we can just move one index before. In worst case we will process (but ignore) few additional entries.
                 index -= 1
-            first_day_to_process = index_keys[index]
+        first_ordinal = max(odometer_index.ordinal_at(index), start_date.toordinal() - 1)
 
         if end_date is None:
             last_day_to_calculate = last_possible_date
         else:
             last_day_to_calculate = min(last_possible_date, end_date)
+        last_ordinal = last_day_to_calculate.toordinal()
 
-        temporary_daily: list[(date, float)] = []
-        # TODO - brutal copy-paste from _update_daily_histogram. To refactor - separate algorithm and action taken on data.
+        distances = self._daily_distances(index, first_ordinal, last_ordinal)
+        return [
+            (date.fromordinal(first_ordinal + offset), daily_distance)
+            for offset, daily_distance in enumerate(distances, 1)
+        ]
 
-        previous_odometer = self.odometer_list[
-            self.odometer_index[first_day_to_process]
-        ][1]
-        current_date = first_day_to_process + timedelta(days=1)
-        while current_date <= last_day_to_calculate:
-            # we are iterating day by day , through this loop we can decide if the day is empty or present in odometer index and make relevant calculations.
-            daily_distance: float = 0
-            if current_date in self.odometer_index:
-                current_odometer = self.odometer_list[
-                    self.odometer_index[current_date]
-                ][1]
-                daily_distance = current_odometer - previous_odometer
-                previous_odometer = current_odometer
-            if current_date >= start_date:  # ignore dates before
-                temporary_daily.append((current_date, daily_distance))
+    def _daily_distances(
+        self, index: int, first_ordinal: int, last_ordinal: int
+    ) -> list[float]:
+        """Distances of days after first_ordinal till last_ordinal.
 
-            # Add histogramic information!
-            current_date += timedelta(days=1)
-        return temporary_daily
+        index points to the last indexed day not later than first_ordinal.
+        """
+        odometer_index = self.odometer_index
+        end_index = odometer_index.bisect_left(date.fromordinal(last_ordinal + 1))
+        readings = [
+            self.odometer_list[position][1]
+            for position in odometer_index.positions(index, end_index)
+        ]
+        return daily_distances(
+            odometer_index.ordinals(index, end_index),
+            readings,
+            first_ordinal,
+            last_ordinal,
+        )
 
     def _update_daily_histogram(self):
         # check the last day which we can calculate from odometer index.
-        keys = list(self.odometer_index.keys())
-        if len(keys) < 2:
+        odometer_index = self.odometer_index
+        if len(odometer_index) < 2:
             # nothing to do! With only one day indexed we cannot calcuate the day.
             return
-        last_day_to_calculate = keys[-2]
+        last_ordinal = odometer_index.ordinal_at(-2)
 
         if self.daily_histogram_last_date is not None:
-            first_day_to_process = self.daily_histogram_last_date
+            first_ordinal = self.daily_histogram_last_date.toordinal()
+            # last indexed day not later than the last processed one
+            index = odometer_index.bisect_left(date.fromordinal(first_ordinal + 1)) - 1
         else:
-            first_day_to_process = keys[0]
-
-        previous_odometer = self.odometer_list[
-            self.odometer_index[first_day_to_process]
-        ][1]
-
-        temporary_daily: list[date, float] = []
-
-        current_date = first_day_to_process + timedelta(days=1)
-        while current_date <= last_day_to_calculate:
-            # we are iterating day by day , through this loop we can decide if the day is empty or present in odometer index and make relevant calculations.
-            daily_distance: float = 0
-            if current_date in self.odometer_index:
-                current_odometer = self.odometer_list[
-                    self.odometer_index[current_date]
-                ][1]
-                daily_distance = current_odometer - previous_odometer
-                previous_odometer = current_odometer
-            temporary_daily.append((current_date, daily_distance))
+            first_ordinal = odometer_index.ordinal_at(0)
+            index = 0
 
+        distances = self._daily_distances(index, first_ordinal, last_ordinal)
+        for offset, daily_distance in enumerate(distances, 1):
             # Add histogramic information!
-
-            self.daily_histogram[current_date.weekday()].append(daily_distance)
-            self.daily_histogram_last_date = current_date
-
-            current_date += timedelta(days=1)
+            weekday = date.fromordinal(first_ordinal + offset).weekday()
+            self.daily_histogram[weekday].append(daily_distance)
+        if distances:
+            self.daily_histogram_last_date = date.fromordinal(last_ordinal)
 
     def _run_predictor(self, prediction_range_days: int = 7) -> float:
         # self.predictor_input_last_date: date | None = None
         # self.predictor_output: list[datetime, list[float]] = []
 
+        if self.daily_histogram_last_date is None:
+            return  # not enough odometer data yet
         # check if anything changed in histogram
         if (
             self.predictor_input_last_date is not None
@@ -541,6 +780,6 @@ class SLXTripPlanner:
     def _subscribe_entity(
         self, entity_name: str, external_calback: Callable[[Event], Any]
     ) -> None:
-        self.unsub_dict[entity_name] = async_track_state_change_event(
-            self.hass, entity_name, external_calback
+        self.unsub_dict[entity_name] = self.dispatcher.subscribe(
+            entity_name, external_calback
         )
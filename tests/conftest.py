@@ -1,5 +1,6 @@
 """Global fixtures for openevse integration."""
 
+import copy
 from unittest import mock
 from unittest.mock import patch
 
@@ -80,7 +81,8 @@ async def creation_of_coordinator(hass, params: any = None):
     if params is None:
         config_entry = MockConfigEntry(**FIXTURE__DEFAULT_CONFIG_ENTRY)
     else:
-        tmp_config = FIXTURE__DEFAULT_CONFIG_ENTRY
+        # copy, so options don't leak into next tests
+        tmp_config = copy.deepcopy(FIXTURE__DEFAULT_CONFIG_ENTRY)
         _LOGGER.warning(params)
         for k, v in params.items():
             tmp_config["options"][k] = v
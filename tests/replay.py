@@ -0,0 +1,249 @@
+"""Headless event replay for SLXChargingController.
+
+Feeds recorded or synthetic EVSE, plug, SOC and odometer streams through
+SLXChgCtrlUpdateCoordinator. Timers (SlxTimer) are driven by a virtual clock,
+so days of charging are replayed in seconds.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import heapq
+import itertools
+import time
+from typing import Any, NamedTuple
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant, State
+
+from custom_components.slxchargingcontroller.coordinator import (
+    SLXChgCtrlUpdateCoordinator,
+)
+
+# kinds of replayed events
+EVENT_ENERGY = "energy"
+EVENT_PLUG = "plug"
+EVENT_SOC = "soc"
+EVENT_SOC_UPDATE = "soc_update"
+EVENT_ODOMETER = "odometer"
+
+
+class ReplayEvent(NamedTuple):
+    """Single input event - time, kind of event (EVENT_*) and value"""
+
+    time: datetime
+    kind: str
+    value: Any
+
+
+class ReplayStateEvent(NamedTuple):
+    """Minimal state changed event, exposes what coordinator's callbacks are using"""
+
+    data: dict[str, Any]
+    time_fired: datetime
+
+
+class ReplayResult:
+    """Outcome of the replay"""
+
+    def __init__(self) -> None:
+        self.events: int = 0
+        self.timers_fired: int = 0
+        self.charger_commands: list[tuple[datetime, str]] = []
+        self.soc_requests: list[datetime] = []
+        # time[s] spent in coordinator for each replayed event
+        self.decision_latency: list[float] = []
+        self.wall_time: float = 0
+
+    def max_latency(self) -> float:
+        return max(self.decision_latency, default=0)
+
+    def mean_latency(self) -> float:
+        if not self.decision_latency:
+            return 0
+        return sum(self.decision_latency) / len(self.decision_latency)
+
+
+class VirtualClock:
+    """Virtual time replacing async_call_later used by SlxTimer and dt_util.utcnow"""
+
+    def __init__(self, start: datetime) -> None:
+        self.now: datetime = start
+        self._queue: list[tuple[datetime, int, Callable[[datetime], Any]]] = []
+        self._sequence = itertools.count()
+        self._cancelled: set[int] = set()
+
+    def utcnow(self) -> datetime:
+        return self.now
+
+    def async_call_later(
+        self,
+        hass: HomeAssistant,
+        delay: float | timedelta,
+        action: Callable[[datetime], Any],
+    ) -> Callable[[], None]:
+        if isinstance(delay, timedelta):
+            delay = delay.total_seconds()
+        sequence = next(self._sequence)
+        heapq.heappush(
+            self._queue, (self.now + timedelta(seconds=delay), sequence, action)
+        )
+
+        def cancel() -> None:
+            self._cancelled.add(sequence)
+
+        return cancel
+
+    def advance_to(self, when: datetime) -> int:
+        """Move time forward firing all timers due until given time.
+
+        Returns number of fired timers.
+        """
+        fired: int = 0
+        while self._queue and self._queue[0][0] <= when:
+            fire_time, sequence, action = heapq.heappop(self._queue)
+            if sequence in self._cancelled:
+                self._cancelled.discard(sequence)
+                continue
+            self.now = fire_time
+            action(fire_time)
+            fired += 1
+        if when > self.now:
+            self.now = when
+        return fired
+
+    @contextmanager
+    def patch(self) -> Iterator[VirtualClock]:
+        with patch(
+            "custom_components.slxchargingcontroller.timer.async_call_later",
+            self.async_call_later,
+        ), patch("homeassistant.util.dt.utcnow", self.utcnow):
+            yield self
+
+
+class ChargingReplay:
+    """Replays events through the coordinator using virtual clock"""
+
+    def __init__(
+        self, coordinator: SLXChgCtrlUpdateCoordinator, clock: VirtualClock
+    ) -> None:
+        self.coordinator = coordinator
+        self.clock = clock
+        self.result = ReplayResult()
+
+        # entities used to build states passed to coordinator's callbacks
+        self._entities: dict[str, str] = {
+            EVENT_ENERGY: coordinator.evse.session_energy_entity(),
+            EVENT_PLUG: coordinator.evse.plug_entity(),
+            EVENT_SOC: coordinator.car.soc_level_entity,
+            EVENT_SOC_UPDATE: coordinator.car.soc_update_entity,
+            EVENT_ODOMETER: coordinator.car.odometer_entity(),
+        }
+        self._attributes: dict[str, dict[str, Any]] = {
+            EVENT_ENERGY: {"unit_of_measurement": "kWh"}
+        }
+
+        manager = coordinator.charging_manager
+        manager.set_charger_mode_callback(self._record_charger_mode)
+        manager.set_soc_requested_callback(self._record_soc_request)
+
+    def _record_charger_mode(self, charger_mode: str) -> None:
+        self.result.charger_commands.append((self.clock.now, charger_mode))
+        self.coordinator.callback_charger_mode(charger_mode)
+
+    def _record_soc_request(self, request_counter: int = -1) -> None:
+        self.result.soc_requests.append(self.clock.now)
+        self.coordinator.callback_soc_requested(request_counter)
+
+    def _state_event(self, event: ReplayEvent) -> ReplayStateEvent:
+        state = State(
+            self._entities[event.kind] or f"replay.{event.kind}",
+            str(event.value),
+            self._attributes.get(event.kind),
+        )
+        return ReplayStateEvent({"new_state": state}, event.time)
+
+    async def async_run(self, events: Iterable[ReplayEvent]) -> ReplayResult:
+        coordinator = self.coordinator
+        handlers: dict[str, Callable[[ReplayStateEvent], Any]] = {
+            EVENT_ENERGY: coordinator.callback_charger_session_energy,
+            EVENT_PLUG: coordinator.callback_charger_plug_connected,
+            EVENT_SOC: coordinator.callback_soc_level,
+            EVENT_SOC_UPDATE: coordinator.callback_soc_update,
+        }
+        wall_start = time.perf_counter()
+        for event in events:
+            self.result.timers_fired += self.clock.advance_to(event.time)
+            state_event = self._state_event(event)
+            start = time.perf_counter()
+            if event.kind == EVENT_ODOMETER:
+                await coordinator.trip_planner._callback_odometer_value(state_event)
+            else:
+                handlers[event.kind](state_event)
+            self.result.decision_latency.append(time.perf_counter() - start)
+            self.result.events += 1
+        self.result.wall_time = time.perf_counter() - wall_start
+        return self.result
+
+
+def synthetic_charging_events(
+    start: datetime,
+    days: int = 7,
+    sample_interval: timedelta = timedelta(minutes=1),
+    charging_power: float = 7.2,
+    battery_capacity: float = 10,
+    soc_at_plug: float = 30,
+) -> list[ReplayEvent]:
+    """Generate daily charging sessions - plug connected at 18:00, removed at 7:00.
+
+    SOC is reported shortly after plug is connected.
+    Odometer is reported when car comes back home.
+    """
+    events: list[ReplayEvent] = []
+    odometer: float = 10000
+    samples_per_hour = timedelta(hours=1) / sample_interval
+    energy_per_sample = charging_power / samples_per_hour
+    for day in range(days):
+        plug_time = start + timedelta(days=day, hours=18)
+        unplug_time = plug_time + timedelta(hours=13)
+        odometer += 30 + 10 * (day % 3)
+        events.append(
+            ReplayEvent(plug_time - timedelta(minutes=5), EVENT_ODOMETER, odometer)
+        )
+        events.append(ReplayEvent(plug_time, EVENT_PLUG, "on"))
+
+        session_energy: float = 0
+        # charge until battery would be full
+        energy_to_full = battery_capacity * (100 - soc_at_plug) / 100
+        sample_time = plug_time
+        while sample_time < unplug_time:
+            events.append(
+                ReplayEvent(sample_time, EVENT_ENERGY, round(session_energy, 3))
+            )
+            if session_energy < energy_to_full:
+                session_energy += energy_per_sample
+            sample_time += sample_interval
+            if sample_time == plug_time + timedelta(minutes=1):
+                events.append(ReplayEvent(sample_time, EVENT_SOC, soc_at_plug))
+        events.append(ReplayEvent(unplug_time, EVENT_PLUG, "off"))
+    events.sort(key=lambda event: event.time)
+    return events
+
+
+def recorded_events(
+    history: dict[str, list[State]], kinds: dict[str, str]
+) -> list[ReplayEvent]:
+    """Translate recorder history (entity_id -> states) into replay events.
+
+    kinds maps entity_id into kind of event (EVENT_*).
+    """
+    events: list[ReplayEvent] = [
+        ReplayEvent(state.last_changed, kinds[entity_id], state.state)
+        for entity_id, states in history.items()
+        if entity_id in kinds
+        for state in states
+    ]
+    events.sort(key=lambda event: event.time)
+    return events
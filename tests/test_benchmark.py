@@ -0,0 +1,183 @@
+"""Benchmarks for the energy tracking hot path.
+
+Synthetic charging sessions of 1k, 100k and 1M samples are fed into
+SlxEnergyTracker and SLXChargingManager.add_charger_energy. Per-sample latency,
+peak memory (tracemalloc) and total session cost are compared against
+benchmark_baseline.json. Timings depend on hardware, so by default only results
+of the sessions are checked.
+
+Environment variables:
+    SLX_BENCHMARK=1         measure and compare against baseline
+    SLX_BENCHMARK_LARGE=1   run also 1M sample sessions
+    SLX_BENCHMARK_FACTOR    allowed regression factor against baseline (default 3)
+    SLX_BENCHMARK_UPDATE=1  write measured values as a new baseline
+"""
+
+from custom_components.slxchargingcontroller.chargingmanager import (
+    CHARGING_EFFICIENCY,
+    SlxEnergyTracker,
+    SLXChargingManager,
+)
+from custom_components.slxchargingcontroller.slxcar import SLXCar
+from custom_components.slxchargingcontroller.const import CHR_METHOD_ECO
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+import json
+import logging
+import math
+import os
+import time
+import tracemalloc
+
+import pytest
+
+_LOGGER = logging.getLogger(__name__)
+
+BENCHMARK = (
+    os.environ.get("SLX_BENCHMARK") == "1"
+    or os.environ.get("SLX_BENCHMARK_UPDATE") == "1"
+)
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+REGRESSION_FACTOR = float(os.environ.get("SLX_BENCHMARK_FACTOR", "3"))
+# absolute slack, so small baselines do not fail on noise
+REGRESSION_SLACK = {"latency_us": 1.0, "peak_kib": 16.0, "total_s": 0.05}
+
+SESSION_START = datetime(2023, 1, 1, 18, 0, tzinfo=timezone.utc)
+SESSION_DURATION = timedelta(hours=24)
+
+SIZES = [
+    1_000,
+    100_000,
+    pytest.param(
+        1_000_000,
+        marks=pytest.mark.skipif(
+            os.environ.get("SLX_BENCHMARK_LARGE") != "1",
+            reason="set SLX_BENCHMARK_LARGE=1 to run 1M sample sessions",
+        ),
+    ),
+]
+
+
+def synthetic_session(samples: int) -> list[tuple[datetime, float]]:
+    """Energy samples evenly spread over SESSION_DURATION, ~7.2kW with ripple."""
+    interval = SESSION_DURATION / samples
+    interval_hours = interval.total_seconds() / 3600
+    session: list[tuple[datetime, float]] = []
+    energy: float = 0
+    for i in range(samples):
+        session.append((SESSION_START + i * interval, energy))
+        energy += 7.2 * interval_hours * (1 + 0.05 * math.sin(i / 50))
+    return session
+
+
+def measure(
+    feed: Callable[[list[tuple[datetime, float]]], None],
+    session: list[tuple[datetime, float]],
+) -> dict[str, float]:
+    """Run feed on the session twice - for timing and for peak memory.
+
+    tracemalloc slows down allocations, so it is not active while timing.
+    """
+    start = time.perf_counter()
+    feed(session)
+    total = time.perf_counter() - start
+
+    tracemalloc.start()
+    feed(session)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "latency_us": total / len(session) * 1e6,
+        "peak_kib": peak / 1024,
+        "total_s": total,
+    }
+
+
+def check_against_baseline(name: str, samples: int, result: dict[str, float]):
+    _LOGGER.warning(
+        "%s[%d]: %.2f us/sample, peak %.1f KiB, total %.3f s",
+        name,
+        samples,
+        result["latency_us"],
+        result["peak_kib"],
+        result["total_s"],
+    )
+    baseline: dict[str, dict[str, dict[str, float]]] = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    if os.environ.get("SLX_BENCHMARK_UPDATE") == "1":
+        baseline.setdefault(name, {})[str(samples)] = {
+            key: round(value, 3) for key, value in result.items()
+        }
+        with open(BASELINE_FILE, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write("\n")
+        return
+
+    reference = baseline.get(name, {}).get(str(samples))
+    assert reference is not None, f"No baseline for {name}[{samples}]"
+    for key, value in result.items():
+        limit = reference[key] * REGRESSION_FACTOR + REGRESSION_SLACK[key]
+        assert value <= limit, (
+            f"{name}[{samples}] {key} regressed: {value:.3f} > {limit:.3f}"
+            f" (baseline {reference[key]})"
+        )
+
+
+def feed_tracker(session: list[tuple[datetime, float]]) -> SlxEnergyTracker:
+    energy_tracker = SlxEnergyTracker(soc_before_energy=300, soc_after_energy=200)
+    energy_tracker.connect_plug()
+    energy_tracker.update_soc(session[0][0], 30)
+    for sample_time, energy in session:
+        energy_tracker.add_entry(energy, sample_time)
+    return energy_tracker
+
+
+@pytest.mark.parametrize("samples", SIZES)
+def test_benchmark_energy_tracker(samples: int):
+    session = synthetic_session(samples)
+    energy_tracker = feed_tracker(session)
+    # SOC was checked at the first sample with zero session energy
+    assert math.isclose(energy_tracker.get_added_energy(), session[-1][1])
+    assert len(energy_tracker._history_time) <= energy_tracker._history_limit
+
+    if BENCHMARK:
+        result = measure(feed_tracker, session)
+        check_against_baseline("energy_tracker", samples, result)
+
+
+@pytest.mark.parametrize("samples", SIZES)
+def test_benchmark_charging_manager(samples: int):
+    session = synthetic_session(samples)
+
+    def feed_manager(session: list[tuple[datetime, float]]) -> SLXChargingManager:
+        charging_manager = SLXChargingManager(
+            MagicMock(), SLXCar(MagicMock()).dynamic_config
+        )
+        charging_manager.set_energy_estimated_callback(lambda energy: None)
+        charging_manager.set_soc_requested_callback(lambda counter: None)
+        charging_manager.set_charger_mode_callback(lambda mode: None)
+        charging_manager.battery_capacity = 64
+        charging_manager.soc_minimum = 20
+        charging_manager.soc_maximum = 80
+        charging_manager.target_soc = 60
+        charging_manager.charge_method = CHR_METHOD_ECO
+        charging_manager.plug_connected()
+        charging_manager.set_soc_level(30, session[0][0])
+        for sample_time, energy in session:
+            charging_manager.add_charger_energy(energy, sample_time)
+        return charging_manager
+
+    with patch("custom_components.slxchargingcontroller.timer.async_call_later"):
+        charging_manager = feed_manager(session)
+        assert math.isclose(
+            charging_manager._attr_bat_energy_estimated,
+            64 * 0.3 + session[-1][1] * CHARGING_EFFICIENCY,
+        )
+
+        if BENCHMARK:
+            result = measure(feed_manager, session)
+            check_against_baseline("charging_manager", samples, result)
@@ -0,0 +1,92 @@
+"""Test the command queue sending service calls to devices."""
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from custom_components.slxchargingcontroller.commandqueue import SlxCommandQueue
+
+import asyncio
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def test_command_queue_ordered_per_device(hass: HomeAssistant) -> None:
+    calls: list[tuple[str, int]] = []
+
+    async def slow_service(call: ServiceCall) -> None:
+        # first command of each device is the slowest one
+        await asyncio.sleep(0.03 - 0.01 * call.data["order"])
+        calls.append((call.data["device"], call.data["order"]))
+
+    hass.services.async_register("slxtest", "command", slow_service)
+
+    command_queue = SlxCommandQueue(hass)
+    futures = [
+        command_queue.send(
+            device, "slxtest", "command", {"device": device, "order": order}
+        )
+        for order in range(3)
+        for device in ("evse", "car")
+    ]
+    results = await asyncio.gather(*futures)
+    assert all(results)
+
+    assert [order for device, order in calls if device == "evse"] == [0, 1, 2]
+    assert [order for device, order in calls if device == "car"] == [0, 1, 2]
+    # devices are handled concurrently - commands are interleaved
+    assert calls[0][1] == 0 and calls[1][1] == 0
+
+
+async def test_command_queue_failed_command(hass: HomeAssistant) -> None:
+    calls: list[str] = []
+
+    async def service(call: ServiceCall) -> None:
+        calls.append(call.service)
+
+    hass.services.async_register("slxtest", "command", service)
+
+    command_queue = SlxCommandQueue(hass)
+    missing = command_queue.send("evse", "slxtest", "missing_service", {})
+    existing = command_queue.send("evse", "slxtest", "command", {})
+
+    assert await missing is False
+    assert await existing is True, "Failed command doesn't block next ones"
+    assert calls == ["command"]
+
+
+async def test_command_queue_unexpected_error(hass: HomeAssistant) -> None:
+    calls: list[int] = []
+
+    async def service(call: ServiceCall) -> None:
+        calls.append(call.data["order"])
+        if call.data["order"] == 0:
+            raise RuntimeError("Unexpected failure")
+
+    hass.services.async_register("slxtest", "command", service)
+
+    command_queue = SlxCommandQueue(hass)
+    failing = command_queue.send("evse", "slxtest", "command", {"order": 0})
+    next_command = command_queue.send("evse", "slxtest", "command", {"order": 1})
+
+    assert await failing is False
+    assert await next_command is True
+    await hass.async_block_till_done()
+    assert calls == [0, 1], "Failing command is sent only once"
+
+
+async def test_command_queue_cleanup(hass: HomeAssistant) -> None:
+    blocker = asyncio.Event()
+
+    async def blocking_service(call: ServiceCall) -> None:
+        await blocker.wait()
+
+    hass.services.async_register("slxtest", "command", blocking_service)
+
+    command_queue = SlxCommandQueue(hass)
+    first = command_queue.send("evse", "slxtest", "command", {})
+    second = command_queue.send("evse", "slxtest", "command", {})
+    await asyncio.sleep(0)
+
+    command_queue.cleanup()
+    assert await first is False
+    assert await second is False
+    await hass.async_block_till_done()
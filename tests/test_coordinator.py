@@ -1,21 +1,24 @@
 """Test the for the SLXChargingController coordinator."""
 
 from custom_components.slxchargingcontroller.tests import FIXTURE_CONFIG_ENTRY
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, State
 from custom_components.slxchargingcontroller.chargingmanager import (
     SlxEnergyTracker,
     CarConnectedStates,
+    CHARGING_EFFICIENCY,
 )
 from custom_components.slxchargingcontroller.const import CONF_CAR_SOC_LEVEL
 from custom_components.slxchargingcontroller.slxcar import SLXCar
 from custom_components.slxchargingcontroller.coordinator import (
     SLXChgCtrlUpdateCoordinator,
 )
+from custom_components.slxchargingcontroller.governor import CircuitState
 
 from custom_components.slxchargingcontroller.const import (
     CONF_EVSE_SESSION_ENERGY,
     CONF_EVSE_PLUG_CONNECTED,
     CHR_MODE_NORMAL,
+    CHR_MODE_PVCHARGE,
 )
 import homeassistant.util.dt as dt_util
 from datetime import datetime, timedelta
@@ -302,13 +305,90 @@ async def test_estimated_soc_cleared_after_unplug(
     assert coordinator.charging_manager._attr_bat_soc_estimated is None
 
 
-async def test__template(
+async def test_restore_session_after_restart(
     hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator_factory
 ) -> None:
-    coordinator: SLXChgCtrlUpdateCoordinator = await coordinator_factory
+    """Plug is connected at startup - session is rebuilt from history without requesting SOC"""
+    entity_name_evse_plug: str = FIXTURE_CONFIG_ENTRY["options"][
+        CONF_EVSE_PLUG_CONNECTED
+    ]
+    entity_name_evse_energy: str = FIXTURE_CONFIG_ENTRY["options"][
+        CONF_EVSE_SESSION_ENERGY
+    ]
+    entity_name_soc: str = FIXTURE_CONFIG_ENTRY["options"][CONF_CAR_SOC_LEVEL]
+    await helper_set_entity_value(hass, entity_name_evse_plug, "on")
 
+    time_now = dt_util.utcnow()
+    session_history = {
+        entity_name_evse_plug: [
+            State(
+                entity_name_evse_plug,
+                "off",
+                last_changed=time_now - timedelta(hours=2),
+            ),
+            State(
+                entity_name_evse_plug,
+                "on",
+                last_changed=time_now - timedelta(hours=1),
+            ),
+        ],
+        entity_name_evse_energy: [
+            State(
+                entity_name_evse_energy,
+                "5",
+                last_changed=time_now - timedelta(hours=3),
+            ),
+            State(
+                entity_name_evse_energy,
+                "0",
+                last_changed=time_now - timedelta(minutes=59),
+            ),
+            State(
+                entity_name_evse_energy,
+                "1",
+                last_changed=time_now - timedelta(minutes=30),
+            ),
+            State(
+                entity_name_evse_energy,
+                "2",
+                last_changed=time_now - timedelta(minutes=5),
+            ),
+        ],
+        entity_name_soc: [
+            State(
+                entity_name_soc,
+                "30",
+                last_changed=time_now - timedelta(hours=1),
+            ),
+        ],
+    }
 
-## TODO - for some reason this fixt_data is remaining as active impacting any further tests. As workaround temporary moved as the last test.
+    with (
+        patch(
+            "custom_components.slxchargingcontroller.coordinator.SLXChgCtrlUpdateCoordinator._get_session_history",
+            return_value=session_history,
+        ),
+        patch(
+            "custom_components.slxchargingcontroller.slxcarmanual.SLXCarManual.request_soc_update",
+            return_value=True,
+        ) as car_mock,
+    ):
+        coordinator: SLXChgCtrlUpdateCoordinator = await coordinator_factory
+        # session is restored in background task
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert (
+            coordinator.charging_manager._car_connected_status
+            == CarConnectedStates.soc_known
+        )
+        assert len(car_mock.mock_calls) == 0
+        # battery 10kWh: 3kWh at SOC + 2kWh * 0.8 efficiency
+        assert 45.99 < coordinator.charging_manager._attr_bat_soc_estimated < 46.01
+
+
+async def test__template(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator_factory
+) -> None:
+    coordinator: SLXChgCtrlUpdateCoordinator = await coordinator_factory
 
 
 # this is how I can overwrite the default configuration settings
@@ -317,3 +397,294 @@ async def test_alternative_fixture(hass: HomeAssistant, coordinator_factory) ->
     coordinator_instance: SLXChgCtrlUpdateCoordinator = await coordinator_factory
     assert coordinator_instance.charging_manager is not None
     assert coordinator_instance.evse._session_energy_name == "point_evse"
+
+
+async def test_setting_changes_coalesced(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator_factory
+) -> None:
+    """Burst of setting changes results in one EVSE decision after decision delay"""
+    coordinator: SLXChgCtrlUpdateCoordinator = await coordinator_factory
+    decision_delay = coordinator.car_config[SLXCar.CONF_DECISION_DELAY]
+
+    entity_name_soc: str = FIXTURE_CONFIG_ENTRY["options"][CONF_CAR_SOC_LEVEL]
+    entity_name_evse_energy: str = FIXTURE_CONFIG_ENTRY["options"][
+        CONF_EVSE_SESSION_ENERGY
+    ]
+    entity_name_evse_plug: str = FIXTURE_CONFIG_ENTRY["options"][
+        CONF_EVSE_PLUG_CONNECTED
+    ]
+    await helper_set_entity_value(hass, entity_name_soc, "30")
+    await helper_set_entity_value(hass, entity_name_evse_energy, "1")
+    await helper_set_entity_value(hass, entity_name_evse_plug, "on")
+    await hass.async_block_till_done()
+    assert (
+        coordinator.charging_manager._car_connected_status
+        == CarConnectedStates.soc_known
+    )
+
+    with patch(
+        "custom_components.slxchargingcontroller.slxevsemanual.SLXManualEvse.set_charger_mode"
+    ) as evse_mock:
+        await coordinator.set_soc_min(40)
+        await coordinator.set_soc_min(25)
+        await coordinator.set_soc_target(50)
+        await coordinator.set_soc_min(35)
+        assert len(evse_mock.mock_calls) == 0, "Decision waits for decision delay"
+
+        freezer.tick(timedelta(seconds=(decision_delay + 1)))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+        evse_mock.assert_called_once_with(CHR_MODE_NORMAL)
+
+
+async def test_evse_mode_hysteresis_and_dwell(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator_factory
+) -> None:
+    """SOC crossing soc_minimum changes EVSE mode only outside hysteresis band and after minimum dwell time"""
+    coordinator: SLXChgCtrlUpdateCoordinator = await coordinator_factory
+    min_dwell = coordinator.car_config[SLXCar.CONF_MODE_MIN_DWELL]
+    # battery 10kWh, efficiency 0.8 - 0.1kWh of session energy is 0.8% SOC
+
+    entity_name_soc: str = FIXTURE_CONFIG_ENTRY["options"][CONF_CAR_SOC_LEVEL]
+    entity_name_evse_energy: str = FIXTURE_CONFIG_ENTRY["options"][
+        CONF_EVSE_SESSION_ENERGY
+    ]
+    entity_name_evse_plug: str = FIXTURE_CONFIG_ENTRY["options"][
+        CONF_EVSE_PLUG_CONNECTED
+    ]
+
+    with patch(
+        "custom_components.slxchargingcontroller.slxevsemanual.SLXManualEvse.set_charger_mode"
+    ) as evse_mock:
+        await helper_set_entity_value(hass, entity_name_soc, "19")
+        await helper_set_entity_value(hass, entity_name_evse_energy, "1")
+        await helper_set_entity_value(hass, entity_name_evse_plug, "on")
+        await hass.async_block_till_done()
+        evse_mock.assert_called_once_with(CHR_MODE_NORMAL)
+
+        freezer.tick(timedelta(seconds=10))
+        await helper_set_entity_value(hass, entity_name_evse_energy, "1.2")
+        await hass.async_block_till_done()
+        assert 20.5 < coordinator.charging_manager._attr_bat_soc_estimated < 20.7
+        assert len(evse_mock.mock_calls) == 1, "SOC within hysteresis band"
+
+        freezer.tick(timedelta(seconds=10))
+        await helper_set_entity_value(hass, entity_name_evse_energy, "1.4")
+        await hass.async_block_till_done()
+        assert 22.1 < coordinator.charging_manager._attr_bat_soc_estimated < 22.3
+        assert len(evse_mock.mock_calls) == 1, "Minimum dwell time not passed"
+
+        freezer.tick(timedelta(seconds=min_dwell))
+        await helper_set_entity_value(hass, entity_name_evse_energy, "1.45")
+        await hass.async_block_till_done()
+        evse_mock.assert_called_with(CHR_MODE_PVCHARGE)
+        assert len(evse_mock.mock_calls) == 2
+
+
+async def test_evse_mode_changed_after_dwell_without_updates(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator_factory
+) -> None:
+    """EVSE mode change blocked by minimum dwell time is applied when dwell time passes, even without new energy samples"""
+    coordinator: SLXChgCtrlUpdateCoordinator = await coordinator_factory
+    min_dwell = coordinator.car_config[SLXCar.CONF_MODE_MIN_DWELL]
+
+    entity_name_soc: str = FIXTURE_CONFIG_ENTRY["options"][CONF_CAR_SOC_LEVEL]
+    entity_name_evse_energy: str = FIXTURE_CONFIG_ENTRY["options"][
+        CONF_EVSE_SESSION_ENERGY
+    ]
+    entity_name_evse_plug: str = FIXTURE_CONFIG_ENTRY["options"][
+        CONF_EVSE_PLUG_CONNECTED
+    ]
+
+    with patch(
+        "custom_components.slxchargingcontroller.slxevsemanual.SLXManualEvse.set_charger_mode"
+    ) as evse_mock:
+        await helper_set_entity_value(hass, entity_name_soc, "19")
+        await helper_set_entity_value(hass, entity_name_evse_energy, "1")
+        await helper_set_entity_value(hass, entity_name_evse_plug, "on")
+        await hass.async_block_till_done()
+        evse_mock.assert_called_once_with(CHR_MODE_NORMAL)
+
+        freezer.tick(timedelta(seconds=20))
+        await helper_set_entity_value(hass, entity_name_evse_energy, "1.4")
+        await hass.async_block_till_done()
+        assert 22.1 < coordinator.charging_manager._attr_bat_soc_estimated < 22.3
+        assert len(evse_mock.mock_calls) == 1, "Minimum dwell time not passed"
+
+        # no more energy samples - charger is paused
+        freezer.tick(timedelta(seconds=min_dwell - 20 - 1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert len(evse_mock.mock_calls) == 1
+
+        freezer.tick(timedelta(seconds=2))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        evse_mock.assert_called_with(CHR_MODE_PVCHARGE)
+        assert len(evse_mock.mock_calls) == 2
+
+
+async def test_soc_request_planned_from_charge_rate(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator_factory
+) -> None:
+    """Next SOC request is planned when estimated SOC reaches soc_minimum, not after fixed CONF_SOC_NEXT_UPDATE"""
+    coordinator: SLXChgCtrlUpdateCoordinator = await coordinator_factory
+    soc_next_update = coordinator.car_config[SLXCar.CONF_SOC_NEXT_UPDATE]
+
+    entity_name_soc: str = FIXTURE_CONFIG_ENTRY["options"][CONF_CAR_SOC_LEVEL]
+    entity_name_evse_energy: str = FIXTURE_CONFIG_ENTRY["options"][
+        CONF_EVSE_SESSION_ENERGY
+    ]
+    entity_name_evse_plug: str = FIXTURE_CONFIG_ENTRY["options"][
+        CONF_EVSE_PLUG_CONNECTED
+    ]
+
+    with patch(
+        "custom_components.slxchargingcontroller.slxcarmanual.SLXCarManual.request_soc_update",
+        return_value=True,
+    ) as car_mock:
+        await helper_set_entity_value(hass, entity_name_soc, "10")
+        await helper_set_entity_value(hass, entity_name_evse_energy, "1")
+        await helper_set_entity_value(hass, entity_name_evse_plug, "on")
+        await hass.async_block_till_done()
+        assert len(car_mock.mock_calls) == 0
+
+        # charging with 3.6kW, battery 10kWh - SOC grows 0.48% per minute
+        for minute in range(1, 6):
+            freezer.tick(timedelta(seconds=60))
+            await helper_set_entity_value(
+                hass, entity_name_evse_energy, str(1 + 0.06 * minute)
+            )
+            await hass.async_block_till_done()
+        assert 12.3 < coordinator.charging_manager._attr_bat_soc_estimated < 12.5
+
+        # request is planned when estimated SOC reaches soc_minimum (~1250s after plug)
+        charging_manager = coordinator.charging_manager
+        soc_rate = (
+            3.6 * CHARGING_EFFICIENCY * 100 / charging_manager._battery_capacity / 3600
+        )
+        expected_request = (charging_manager._soc_minimum - 10) / soc_rate
+        assert expected_request < soc_next_update, "Earlier than fixed schedule"
+
+        freezer.tick(timedelta(seconds=expected_request - 300 - 10))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert len(car_mock.mock_calls) == 0
+
+        freezer.tick(timedelta(seconds=20))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert len(car_mock.mock_calls) == 1, "Request sent at planned time"
+
+
+async def test_soc_request_result_reported_to_governor(
+    hass: HomeAssistant, coordinator_factory
+) -> None:
+    """Governor gets result of service call, not just information that request was queued"""
+    coordinator: SLXChgCtrlUpdateCoordinator = await coordinator_factory
+    governor = coordinator._soc_request_governor
+
+    for service_result, expected_call in (
+        (False, "record_failure"),
+        (True, "record_success"),
+    ):
+        result = hass.loop.create_future()
+        with (
+            patch(
+                "custom_components.slxchargingcontroller.slxcarmanual.SLXCarManual.request_soc_update",
+                return_value=result,
+            ),
+            patch.object(
+                governor, "record_success", wraps=governor.record_success
+            ) as success_mock,
+            patch.object(
+                governor, "record_failure", wraps=governor.record_failure
+            ) as failure_mock,
+        ):
+            coordinator.callback_soc_requested()
+            await hass.async_block_till_done()
+            assert success_mock.call_count == 0 and failure_mock.call_count == 0
+
+            result.set_result(service_result)
+            await hass.async_block_till_done()
+            called = success_mock if expected_call == "record_success" else failure_mock
+            assert called.call_count == 1, f"{expected_call} expected"
+            assert success_mock.call_count + failure_mock.call_count == 1
+
+
+async def test_soc_request_not_retried_during_trial(
+    hass: HomeAssistant, coordinator_factory
+) -> None:
+    """While trial request of half-open circuit is pending, blocked requests don't schedule retries"""
+    coordinator: SLXChgCtrlUpdateCoordinator = await coordinator_factory
+    governor = coordinator._soc_request_governor
+    governor._state = CircuitState.half_open
+    retry_timer = coordinator._timer_soc_update_retry
+
+    result = hass.loop.create_future()
+    with patch(
+        "custom_components.slxchargingcontroller.slxcarmanual.SLXCarManual.request_soc_update",
+        return_value=result,
+    ) as car_mock:
+        coordinator.callback_soc_requested()
+        coordinator.callback_soc_requested()
+        await hass.async_block_till_done()
+        assert len(car_mock.mock_calls) == 1, "Only trial request is sent"
+        assert not retry_timer.scheduled
+
+        result.set_result(True)
+        await hass.async_block_till_done()
+        assert governor.state is CircuitState.closed
+        assert not retry_timer.scheduled
+
+
+async def test_entity_updates_throttled(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator_factory
+) -> None:
+    """Energy samples coming faster than allowed rate result in coalesced update"""
+    coordinator: SLXChgCtrlUpdateCoordinator = await coordinator_factory
+
+    entity_name_soc: str = FIXTURE_CONFIG_ENTRY["options"][CONF_CAR_SOC_LEVEL]
+    entity_name_evse_energy: str = FIXTURE_CONFIG_ENTRY["options"][
+        CONF_EVSE_SESSION_ENERGY
+    ]
+    entity_name_evse_plug: str = FIXTURE_CONFIG_ENTRY["options"][
+        CONF_EVSE_PLUG_CONNECTED
+    ]
+    await helper_set_entity_value(hass, entity_name_soc, "30")
+    await helper_set_entity_value(hass, entity_name_evse_plug, "on")
+    freezer.tick(timedelta(seconds=10))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    with patch.object(coordinator, "async_set_updated_data") as update_mock:
+        for energy in range(1, 6):
+            await helper_set_entity_value(hass, entity_name_evse_energy, str(energy))
+        assert len(update_mock.mock_calls) == 1, "Next updates are coalesced"
+
+        freezer.tick(timedelta(seconds=1))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert len(update_mock.mock_calls) == 2
+
+        freezer.tick(timedelta(seconds=10))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert len(update_mock.mock_calls) == 2, "Nothing pending"
+
+    energy_entity_id = next(
+        entity_id
+        for entity_id in hass.states.async_entity_ids(SENSOR_DOMAIN)
+        if entity_id.endswith("battery_energy_estimation")
+    )
+    # updates above went to the mock, write the current value first
+    coordinator.async_set_updated_data(coordinator.data)
+    await hass.async_block_till_done()
+    last_updated = hass.states.get(energy_entity_id).last_updated
+    freezer.tick(timedelta(seconds=10))
+    coordinator.async_set_updated_data(coordinator.data)
+    await hass.async_block_till_done()
+    assert (
+        hass.states.get(energy_entity_id).last_updated == last_updated
+    ), "State isn't written when displayed value didn't change"
@@ -0,0 +1,77 @@
+"""Test the single state change listener routing events to handlers."""
+
+from homeassistant.core import HomeAssistant, Event, callback
+from custom_components.slxchargingcontroller.dispatcher import SlxEventDispatcher
+
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def test_dispatcher_routes_events(hass: HomeAssistant) -> None:
+    received: list[tuple[str, str]] = []
+
+    @callback
+    def handler_energy(event: Event) -> None:
+        received.append(("energy", event.data["new_state"].state))
+
+    @callback
+    def handler_all(event: Event) -> None:
+        received.append(("all", event.data["entity_id"]))
+
+    async def handler_odometer(event: Event) -> None:
+        received.append(("odometer", event.data["new_state"].state))
+
+    dispatcher = SlxEventDispatcher(hass)
+    unsub_energy = dispatcher.subscribe("sensor.energy", handler_energy, "energy")
+    dispatcher.subscribe(["sensor.energy", "binary_sensor.plug"], handler_all, "all")
+
+    hass.states.async_set("sensor.energy", "1.5")
+    hass.states.async_set("sensor.other", "1")
+    await hass.async_block_till_done()
+    assert received == [("energy", "1.5"), ("all", "sensor.energy")]
+
+    # entity registered after listener was created
+    dispatcher.subscribe("sensor.odometer", handler_odometer, "odometer")
+    hass.states.async_set("sensor.odometer", "1000")
+    hass.states.async_set("binary_sensor.plug", "on")
+    await hass.async_block_till_done()
+    # coroutine handler is run as a task
+    assert sorted(received[2:]) == [("all", "binary_sensor.plug"), ("odometer", "1000")]
+
+    unsub_energy()
+    hass.states.async_set("sensor.energy", "2.5")
+    await hass.async_block_till_done()
+    assert received[4:] == [("all", "sensor.energy")]
+
+    statistics = dispatcher.statistics()
+    assert statistics["all"]["count"] == 3
+    assert statistics["odometer"]["count"] == 1
+    assert "energy" not in statistics, "Unsubscribed handler is removed"
+    assert statistics["all"]["max_time"] >= 0
+
+    dispatcher.cleanup()
+    hass.states.async_set("binary_sensor.plug", "off")
+    await hass.async_block_till_done()
+    assert len(received) == 5
+
+
+async def test_dispatcher_handler_error(hass: HomeAssistant) -> None:
+    received: list[str] = []
+
+    @callback
+    def failing_handler(event: Event) -> None:
+        raise ValueError("Handler failed")
+
+    @callback
+    def handler(event: Event) -> None:
+        received.append(event.data["new_state"].state)
+
+    dispatcher = SlxEventDispatcher(hass)
+    dispatcher.subscribe("sensor.energy", failing_handler)
+    dispatcher.subscribe("sensor.energy", handler)
+
+    hass.states.async_set("sensor.energy", "1")
+    await hass.async_block_till_done()
+    assert received == ["1"], "Failing handler doesn't block next ones"
+    dispatcher.cleanup()
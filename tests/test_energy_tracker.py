@@ -94,3 +94,117 @@ def test_energy_tracker_soc_fail():
         assert can_calculate is False
         added_energy = energy_tracker.get_added_energy()
         assert added_energy is None
+
+
+def test_energy_tracker_soc_between_entries():
+    with freeze_time("Jan 1, 2023") as frozen_datetime:
+        energy_tracker = SlxEnergyTracker(soc_before_energy=300, soc_after_energy=200)
+        energy_tracker.connect_plug()
+        for i in range(10):
+            energy_tracker.add_entry(10 + i)
+            frozen_datetime.tick(delta=timedelta(seconds=10))
+
+        # SOC checked between 3rd and 4th entry
+        energy_tracker.update_soc(dt_util.utcnow() - timedelta(seconds=65), 50)
+        can_calculate = energy_tracker.add_entry(20)
+        assert can_calculate is True
+        added_energy = energy_tracker.get_added_energy()
+        assert 6.499 < added_energy < 6.501
+
+        # newer SOC moves the anchor to the latest entries
+        frozen_datetime.tick(delta=timedelta(seconds=10))
+        energy_tracker.update_soc(dt_util.utcnow() - timedelta(seconds=5), 60)
+        can_calculate = energy_tracker.add_entry(22)
+        assert can_calculate is True
+        added_energy = energy_tracker.get_added_energy()
+        assert 0.999 < added_energy < 1.001
+
+
+def test_energy_tracker_history_compaction():
+    with freeze_time("Jan 1, 2023") as frozen_datetime:
+        energy_tracker = SlxEnergyTracker(
+            soc_before_energy=300,
+            soc_after_energy=200,
+            history_limit=1000,
+            history_tolerance=0.01,
+        )
+        energy_tracker.connect_plug()
+        start_time = dt_util.utcnow()
+        # 3 days of charging with 7.2kW, paused every second hour. Entry every 10 seconds.
+        energy: float = 0
+        for i in range(3 * 24 * 360):
+            if (i // 360) % 2 == 0:
+                energy += 0.02
+            energy_tracker.add_entry(energy)
+            frozen_datetime.tick(delta=timedelta(seconds=10))
+
+        assert len(energy_tracker._history_time) < 200
+
+        # SOC checked in the middle of the 3rd hour, between entries 900 and 901.
+        soc_time = start_time + timedelta(hours=2, minutes=30, seconds=5)
+        energy_tracker.update_soc(soc_time, 50)
+        added_energy = energy_tracker.get_added_energy()
+        expected_added_energy = energy - 541.5 * 0.02
+        assert abs(added_energy - expected_added_energy) < 0.01
+
+
+def test_energy_tracker_history_limit():
+    with freeze_time("Jan 1, 2023") as frozen_datetime:
+        energy_tracker = SlxEnergyTracker(
+            soc_before_energy=300,
+            soc_after_energy=200,
+            history_limit=50,
+            history_tolerance=0.01,
+        )
+        energy_tracker.connect_plug()
+        # energy changing by steps - no entry can be compressed.
+        for i in range(500):
+            energy_tracker.add_entry(float(i // 2))
+            frozen_datetime.tick(delta=timedelta(seconds=10))
+        energy_tracker.update_soc(dt_util.utcnow() - timedelta(seconds=15), 50)
+        for i in range(500, 1000):
+            energy_tracker.add_entry(float(i // 2))
+            frozen_datetime.tick(delta=timedelta(seconds=10))
+
+        # entries before SOC are removed, the ones after it are decimated.
+        assert len(energy_tracker._history_time) <= 50
+        added_energy = energy_tracker.get_added_energy()
+        assert 249.999 < added_energy < 250.001
+
+
+def test_energy_tracker_incremental_added_energy():
+    with freeze_time("Jan 1, 2023") as frozen_datetime:
+        energy_tracker = SlxEnergyTracker(soc_before_energy=300, soc_after_energy=200)
+        energy_tracker.connect_plug()
+        energy_tracker.add_entry(10)
+        frozen_datetime.tick(delta=timedelta(seconds=10))
+        energy_tracker.update_soc(dt_util.utcnow(), 50)
+        frozen_datetime.tick(delta=timedelta(seconds=10))
+        energy_tracker.add_entry(11)
+        frozen_datetime.tick(delta=timedelta(seconds=10))
+        energy_tracker.add_entry(13)
+        # SOC bracket won't change anymore - energy at SOC is not recalculated
+        assert energy_tracker._anchor_fixed is True
+
+        for energy in range(14, 20):
+            frozen_datetime.tick(delta=timedelta(seconds=10))
+            assert energy_tracker.add_entry(energy) is True
+            added_energy = energy_tracker.get_added_energy()
+            assert energy - 10.501 < added_energy < energy - 10.499
+
+
+def test_energy_tracker_add_entries():
+    with freeze_time("Jan 1, 2023"):
+        energy_tracker = SlxEnergyTracker(soc_before_energy=300, soc_after_energy=200)
+        start_time = dt_util.utcnow()
+        entries = [
+            (start_time + timedelta(seconds=10 * i), 10 + 0.1 * i) for i in range(100)
+        ]
+        entries.insert(50, (start_time + timedelta(seconds=505), None))
+        assert energy_tracker.add_entries(entries) is False, "plug is not connected"
+
+        energy_tracker.connect_plug()
+        energy_tracker.update_soc(start_time + timedelta(seconds=105), 50)
+        assert energy_tracker.add_entries(entries) is True
+        added_energy = energy_tracker.get_added_energy()
+        assert 8.849 < added_energy < 8.851
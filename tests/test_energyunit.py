@@ -0,0 +1,57 @@
+"""Test the translation of energy states into kWh."""
+
+from homeassistant.core import HomeAssistant, State
+from custom_components.slxchargingcontroller.energyunit import SlxEnergyNormalizer
+from unittest.mock import patch
+
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def test_energy_normalizer_units():
+    normalizer = SlxEnergyNormalizer("sensor.energy")
+    assert normalizer.normalize(State("sensor.energy", "1500", {})) == 1500
+    assert (
+        normalizer.normalize(
+            State("sensor.energy", "1500", {"unit_of_measurement": "Wh"})
+        )
+        == 1.5
+    )
+    assert (
+        normalizer.normalize(
+            State("sensor.energy", "1.5", {"unit_of_measurement": "kWh"})
+        )
+        == 1.5
+    )
+    assert (
+        normalizer.normalize(
+            State("sensor.energy", "0.0015", {"unit_of_measurement": "MWh"})
+        )
+        == 1.5
+    )
+    assert normalizer.normalize(State("sensor.energy", "unavailable", {})) is None
+    assert normalizer.normalize(State("sensor.energy", "abc", {})) is None
+    assert normalizer.normalize(None) is None
+
+
+async def test_energy_normalizer_factor_cached(hass: HomeAssistant) -> None:
+    normalizer = SlxEnergyNormalizer("sensor.energy")
+
+    with patch.object(
+        SlxEnergyNormalizer,
+        "_update_factor",
+        autospec=True,
+        side_effect=SlxEnergyNormalizer._update_factor,
+    ) as update_mock:
+        for value in range(10):
+            # attributes object is kept by Home Assistant when attributes are the same
+            hass.states.async_set(
+                "sensor.energy", str(value * 1000), {"unit_of_measurement": "Wh"}
+            )
+            assert normalizer.normalize(hass.states.get("sensor.energy")) == value
+        assert update_mock.call_count == 1, "Unit is read only when attributes change"
+
+        hass.states.async_set("sensor.energy", "2", {"unit_of_measurement": "kWh"})
+        assert normalizer.normalize(hass.states.get("sensor.energy")) == 2
+        assert update_mock.call_count == 2
@@ -0,0 +1,111 @@
+from custom_components.slxchargingcontroller.governor import (
+    SlxRequestGovernor,
+    CircuitState,
+)
+from datetime import timedelta
+from freezegun import freeze_time
+import random
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def create_governor() -> SlxRequestGovernor:
+    return SlxRequestGovernor(
+        capacity=3,
+        refill_time=timedelta(minutes=10),
+        backoff_initial=timedelta(seconds=60),
+        backoff_max=timedelta(seconds=300),
+        failure_threshold=4,
+        open_time=timedelta(hours=1),
+        rng=random.Random(1),
+    )
+
+
+def test_governor_token_bucket():
+    with freeze_time("Jan 1, 2023") as frozen_datetime:
+        governor = create_governor()
+        assert governor.allow_request() is True
+        assert governor.allow_request() is True
+        assert governor.allow_request() is True
+        assert governor.allow_request() is False, "Budget used"
+        assert governor.next_allowed() == timedelta(minutes=10)
+
+        frozen_datetime.tick(delta=timedelta(minutes=5))
+        assert governor.allow_request() is False
+        assert governor.next_allowed() == timedelta(minutes=5)
+
+        frozen_datetime.tick(delta=timedelta(minutes=5))
+        assert governor.allow_request() is True
+        assert governor.allow_request() is False
+
+        frozen_datetime.tick(delta=timedelta(hours=5))
+        assert 2.99 < governor.tokens <= 3, "Tokens are limited by capacity"
+
+
+def test_governor_backoff_with_jitter():
+    with freeze_time("Jan 1, 2023"):
+        governor = create_governor()
+        delays = [governor.record_failure() for _ in range(3)]
+        assert timedelta(seconds=48) <= delays[0] <= timedelta(seconds=60)
+        assert timedelta(seconds=96) <= delays[1] <= timedelta(seconds=120)
+        assert timedelta(seconds=192) <= delays[2] <= timedelta(seconds=240)
+        assert governor.state is CircuitState.closed
+
+        governor.record_success()
+        assert governor.retry_delay() <= timedelta(seconds=60), "Backoff is reset"
+
+
+def test_governor_backoff_limit():
+    with freeze_time("Jan 1, 2023"):
+        governor = SlxRequestGovernor(
+            capacity=3,
+            refill_time=timedelta(minutes=10),
+            backoff_initial=timedelta(seconds=60),
+            backoff_max=timedelta(seconds=100),
+            failure_threshold=10,
+            open_time=timedelta(hours=1),
+            jitter=0,
+        )
+        delays = [governor.record_failure() for _ in range(5)]
+        assert delays[-1] == timedelta(seconds=100)
+
+
+def test_governor_circuit_breaker():
+    with freeze_time("Jan 1, 2023") as frozen_datetime:
+        governor = create_governor()
+        for _ in range(3):
+            governor.record_failure()
+        assert governor.state is CircuitState.closed
+        assert governor.record_failure() == timedelta(hours=1)
+        assert governor.state is CircuitState.open
+        assert governor.allow_request() is False
+        assert governor.next_allowed() == timedelta(hours=1)
+
+        frozen_datetime.tick(delta=timedelta(hours=1))
+        assert governor.state is CircuitState.half_open
+        assert governor.allow_request() is True, "Trial request"
+        assert governor.allow_request() is False, "Only one trial request"
+
+        governor.record_failure()
+        assert governor.state is CircuitState.open, "Failed trial opens circuit again"
+
+        frozen_datetime.tick(delta=timedelta(hours=1))
+        assert governor.allow_request() is True
+        governor.record_success()
+        assert governor.state is CircuitState.closed
+        assert governor.allow_request() is True
+
+
+def test_governor_trial_pending():
+    with freeze_time("Jan 1, 2023") as frozen_datetime:
+        governor = create_governor()
+        for _ in range(4):
+            governor.record_failure()
+        frozen_datetime.tick(delta=timedelta(hours=1))
+        assert governor.allow_request() is True, "Trial request"
+        assert governor.allow_request() is False
+        assert governor.next_allowed() is None, "Retry waits for trial result"
+
+        governor.record_success()
+        assert governor.next_allowed() == timedelta(0)
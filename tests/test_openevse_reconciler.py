@@ -0,0 +1,164 @@
+"""Test the entity map and desired-state reconciler of OpenEVSE adapter."""
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from custom_components.slxchargingcontroller.slxopenevse import SLXOpenEvse
+from custom_components.slxchargingcontroller.const import (
+    CHR_MODE_NORMAL,
+    CHR_MODE_PVCHARGE,
+    CHR_MODE_STOPPED,
+)
+from freezegun.api import FrozenDateTimeFactory
+from datetime import timedelta
+
+from tests.common import async_fire_time_changed
+
+import logging
+import pytest
+
+_LOGGER = logging.getLogger(__name__)
+
+ENTITY_DIVERT_MODE = "select.evse_divert_mode"
+ENTITY_OVERRIDE = "switch.evse_manual_override"
+ENTITY_MAX_CURRENT = "select.evse_max_current"
+
+
+async def helper_create_evse(
+    hass: HomeAssistant, calls: list[tuple[str, str]], lost_commands: int = 0
+) -> SLXOpenEvse:
+    """Creates OpenEVSE adapter with fake services, first lost_commands are not applied"""
+    hass.states.async_set(ENTITY_DIVERT_MODE, "fast")
+    hass.states.async_set(ENTITY_OVERRIDE, "off")
+    hass.states.async_set(ENTITY_MAX_CURRENT, "32")
+
+    def apply(entity_id: str, value: str) -> None:
+        if len(calls) > lost_commands:
+            hass.states.async_set(entity_id, value)
+
+    async def select_option(call: ServiceCall) -> None:
+        calls.append((call.data["entity_id"], call.data["option"]))
+        apply(call.data["entity_id"], call.data["option"])
+
+    async def set_override(call: ServiceCall) -> None:
+        calls.append(("set_override", call.data["state"]))
+        apply(ENTITY_OVERRIDE, "on")
+
+    async def clear_override(call: ServiceCall) -> None:
+        calls.append(("clear_override", ""))
+        apply(ENTITY_OVERRIDE, "off")
+
+    hass.services.async_register("select", "select_option", select_option)
+    hass.services.async_register("openevse", "set_override", set_override)
+    hass.services.async_register("openevse", "clear_override", clear_override)
+
+    evse = SLXOpenEvse(hass)
+    evse.openevse_id = "evse_device_id"
+    evse.openevse_slugified_name = "evse"
+    evse._setup_entities()
+    evse.connected = True
+    for entity_id in (ENTITY_DIVERT_MODE, ENTITY_OVERRIDE, ENTITY_MAX_CURRENT):
+        evse._subscribe_entity(entity_id, evse.reconciler.callback_state_changed)
+    return evse
+
+
+async def test_entity_map_and_state_cache(hass: HomeAssistant) -> None:
+    calls: list[tuple[str, str]] = []
+    evse = await helper_create_evse(hass, calls)
+
+    assert evse.session_energy_entity() == "sensor.evse_usage_this_session"
+    assert evse._translated_name("divertmode") == ENTITY_DIVERT_MODE
+    with pytest.raises(TypeError):
+        evse._entity_ids["divertmode"] = "select.other"
+
+    assert evse.get_session_energy() is None, "Entity doesn't exist yet"
+    hass.states.async_set("sensor.evse_usage_this_session", "2.5")
+    await hass.async_block_till_done()
+    assert evse.get_session_energy() == 2.5
+
+    cached_state = evse._states["divertmode"]
+    assert evse._get_value_translated("divertmode") == "fast"
+    hass.states.async_set(ENTITY_DIVERT_MODE, "eco")
+    await hass.async_block_till_done()
+    assert evse._states["divertmode"] is not cached_state
+    assert evse._get_value_translated("divertmode") == "eco"
+    await evse.disconnect()
+
+
+async def test_reconciler_sends_only_missing_commands(hass: HomeAssistant) -> None:
+    calls: list[tuple[str, str]] = []
+    evse = await helper_create_evse(hass, calls)
+
+    evse.set_charger_mode(CHR_MODE_PVCHARGE)
+    await hass.async_block_till_done()
+    assert calls == [(ENTITY_DIVERT_MODE, "eco")], "Override is already cleared"
+    assert evse.reconciler.attempts == 0, "State change confirmed command"
+
+    evse.set_charger_mode(CHR_MODE_PVCHARGE)
+    await hass.async_block_till_done()
+    assert len(calls) == 1, "Charger is already in desired state"
+
+    evse.set_charger_mode(CHR_MODE_NORMAL)
+    await hass.async_block_till_done()
+    assert calls[1:] == [(ENTITY_DIVERT_MODE, "fast"), ("set_override", "active")]
+
+    evse.set_charger_mode(CHR_MODE_STOPPED)
+    await hass.async_block_till_done()
+    assert calls[3:] == [("set_override", "disabled")], "Divert mode is already fast"
+
+    evse.set_max_current(16)
+    await hass.async_block_till_done()
+    assert calls[4:] == [(ENTITY_MAX_CURRENT, "16")]
+    assert evse.reconciler.missing_commands() == []
+    await evse.disconnect()
+
+
+async def test_reconciler_retries_lost_command(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    calls: list[tuple[str, str]] = []
+    evse = await helper_create_evse(hass, calls, lost_commands=1)
+
+    evse.set_charger_mode(CHR_MODE_PVCHARGE)
+    await hass.async_block_till_done()
+    assert len(calls) == 1
+    assert evse.reconciler.missing_commands() == ["divertmode"]
+
+    freezer.tick(timedelta(seconds=31))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert calls == [(ENTITY_DIVERT_MODE, "eco"), (ENTITY_DIVERT_MODE, "eco")]
+    assert evse.reconciler.missing_commands() == []
+    await evse.disconnect()
+
+
+async def test_reconciler_bounded_attempts(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    calls: list[tuple[str, str]] = []
+    evse = await helper_create_evse(hass, calls, lost_commands=100)
+    max_attempts = evse.reconciler.max_attempts
+
+    evse.set_charger_mode(CHR_MODE_PVCHARGE)
+    await hass.async_block_till_done()
+    for _ in range(max_attempts + 2):
+        freezer.tick(timedelta(seconds=31))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+    assert len(calls) == max_attempts
+    await evse.disconnect()
+
+
+async def test_reconciler_releases_restored_current(hass: HomeAssistant) -> None:
+    calls: list[tuple[str, str]] = []
+    evse = await helper_create_evse(hass, calls)
+
+    evse.release_max_current(16)
+    await hass.async_block_till_done()
+    assert calls == [(ENTITY_MAX_CURRENT, "16")]
+    assert evse.reconciler.max_current is None, "Confirmed current isn't kept"
+
+    hass.states.async_set(ENTITY_MAX_CURRENT, "20")
+    evse.set_charger_mode(CHR_MODE_PVCHARGE)
+    await hass.async_block_till_done()
+    assert calls[1:] == [(ENTITY_DIVERT_MODE, "eco")], "User's current not overwritten"
+    await evse.disconnect()
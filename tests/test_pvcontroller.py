@@ -0,0 +1,170 @@
+"""Test the charging current modulation following PV surplus."""
+
+from homeassistant.core import HomeAssistant
+from custom_components.slxchargingcontroller.pvcontroller import (
+    SlxPvCurrentController,
+)
+from freezegun.api import FrozenDateTimeFactory
+from datetime import timedelta
+
+from tests.common import async_fire_time_changed
+
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def create_controller(
+    hass: HomeAssistant, setpoints: list[int]
+) -> SlxPvCurrentController:
+    return SlxPvCurrentController(
+        hass,
+        setpoints.append,
+        min_current=6,
+        max_current=16,
+        voltage=230,
+        deadband=100,
+        max_step=2,
+        min_interval=timedelta(seconds=15),
+    )
+
+
+async def test_pv_controller_slew_and_deadband(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    setpoints: list[int] = []
+    controller = create_controller(hass, setpoints)
+
+    controller.set_grid_power(-2000)
+    assert setpoints == [], "Controller isn't active"
+
+    controller.start()
+    assert setpoints == [6], "Charging starts at minimum current"
+
+    for _ in range(10):
+        freezer.tick(timedelta(seconds=15))
+        controller.set_grid_power(-2000)
+    assert setpoints == [6, 8, 10, 12, 14, 16], "Ramp limited to 2A per step"
+    assert controller.setpoint == 16, "Current limited by maximum"
+
+    freezer.tick(timedelta(seconds=15))
+    controller.set_grid_power(80)
+    assert controller.setpoint == 16, "Import within deadband is ignored"
+
+    freezer.tick(timedelta(seconds=15))
+    controller.set_grid_power(300)
+    assert controller.setpoint == 14, "Import lowers current, rounded down"
+
+    for _ in range(10):
+        freezer.tick(timedelta(seconds=15))
+        controller.set_grid_power(5000)
+    assert controller.setpoint == 6, "Charging isn't stopped below minimum current"
+
+    controller.stop()
+    assert setpoints[-1] == 16, "Maximum current restored"
+    controller.set_grid_power(-2000)
+    assert setpoints[-1] == 16
+
+
+async def test_pv_controller_rate_limit(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    setpoints: list[int] = []
+    controller = create_controller(hass, setpoints)
+    controller.start()
+
+    controller.set_grid_power(-1000)
+    controller.set_grid_power(-1500)
+    assert setpoints == [6], "Readings within minimum interval wait for timer"
+
+    freezer.tick(timedelta(seconds=16))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert setpoints == [6, 8], "Latest reading is used after minimum interval"
+
+    controller.stop()
+    freezer.tick(timedelta(seconds=16))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert setpoints == [6, 8, 16]
+
+
+async def test_pv_controller_restores_charger_current(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    setpoints: list[int] = []
+    controller = SlxPvCurrentController(
+        hass,
+        setpoints.append,
+        min_current=6,
+        max_current=32,
+        voltage=230,
+        phases=3,
+        deadband=100,
+        max_step=2,
+    )
+    controller.start(restore_current=20, options=[6, 10, 16, 20])
+    assert setpoints == [6]
+
+    freezer.tick(timedelta(seconds=15))
+    controller.set_grid_power(-2070)
+    assert setpoints == [6], "3A on three phases is below next accepted current"
+
+    freezer.tick(timedelta(seconds=15))
+    controller.set_grid_power(-3000)
+    assert setpoints == [6, 10], "Setpoint moves to next accepted current"
+
+    for _ in range(5):
+        freezer.tick(timedelta(seconds=15))
+        controller.set_grid_power(-30000)
+    assert setpoints[-1] == 20, "Current limited by charger options"
+
+    freezer.tick(timedelta(seconds=15))
+    controller.set_grid_power(1000)
+    assert setpoints[-1] == 16
+
+    controller.stop()
+    assert setpoints[-1] == 20, "Charger's current from before PV control restored"
+
+
+async def test_pv_controller_pause_without_surplus(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    setpoints: list[int] = []
+    paused: list[bool] = []
+    released: list[int] = []
+    controller = SlxPvCurrentController(
+        hass,
+        setpoints.append,
+        min_current=6,
+        max_current=16,
+        voltage=230,
+        deadband=100,
+        max_step=2,
+        pause_time=timedelta(minutes=5),
+        set_paused=paused.append,
+        release_current=released.append,
+    )
+    controller.start(restore_current=16)
+
+    # no PV surplus, e.g. at night
+    for _ in range(21):
+        freezer.tick(timedelta(seconds=15))
+        controller.set_grid_power(1400)
+    assert paused == [True], "Charging paused after sustained import"
+    assert setpoints == [6]
+
+    # surplus too small for minimum current doesn't resume
+    for _ in range(30):
+        freezer.tick(timedelta(seconds=15))
+        controller.set_grid_power(-1000)
+    assert paused == [True]
+
+    for _ in range(21):
+        freezer.tick(timedelta(seconds=15))
+        controller.set_grid_power(-1500)
+    assert paused == [True, False], "Resumed when surplus allows minimum current"
+
+    controller.stop()
+    assert released == [16], "Restored current is released"
+    assert setpoints[-1] != 16
@@ -0,0 +1,54 @@
+"""Replay a week of charging sessions through the coordinator."""
+
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+from datetime import timedelta
+
+from custom_components.slxchargingcontroller.coordinator import (
+    SLXChgCtrlUpdateCoordinator,
+)
+from custom_components.slxchargingcontroller.const import (
+    CHR_MODE_NORMAL,
+    CHR_MODE_PVCHARGE,
+)
+
+from custom_components.slxchargingcontroller.tests.replay import (
+    ChargingReplay,
+    VirtualClock,
+    synthetic_charging_events,
+)
+
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def test_replay_week_of_charging(
+    hass: HomeAssistant, coordinator_factory
+) -> None:
+    coordinator: SLXChgCtrlUpdateCoordinator = await coordinator_factory
+    start = dt_util.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start += timedelta(days=1)
+    days = 7
+
+    clock = VirtualClock(start)
+    with clock.patch():
+        replay = ChargingReplay(coordinator, clock)
+        # car is plugged in below soc_minimum (20%), so charging starts in NORMAL mode
+        result = await replay.async_run(
+            synthetic_charging_events(start, days=days, soc_at_plug=10)
+        )
+
+    _LOGGER.info(
+        "Replayed %d events in %.3fs, max latency %.6fs",
+        result.events,
+        result.wall_time,
+        result.max_latency(),
+    )
+    assert result.events > days * 13 * 60
+    assert result.timers_fired > 0
+    assert len(result.soc_requests) >= days
+    charger_modes = [mode for _, mode in result.charger_commands]
+    assert CHR_MODE_NORMAL in charger_modes
+    assert CHR_MODE_PVCHARGE in charger_modes, "Mode changed after soc_minimum"
+    assert len(result.decision_latency) == result.events
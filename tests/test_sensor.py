@@ -0,0 +1,94 @@
+"""Test the significant change rules of sensors."""
+
+from custom_components.slxchargingcontroller.sensor import (
+    SLXSensorEntityDescription,
+    SENSOR_DESCRIPTIONS,
+)
+from custom_components.slxchargingcontroller.const import (
+    BATTERY_ENERGY_ESTIMATION,
+    BATTERY_SOC_ESTIMATION,
+)
+from custom_components.slxchargingcontroller.coordinator import (
+    SLXChgCtrlUpdateCoordinator,
+)
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.core import HomeAssistant
+from freezegun.api import FrozenDateTimeFactory
+from datetime import timedelta
+
+from tests.common import async_fire_time_changed
+
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_description(key: str) -> SLXSensorEntityDescription:
+    return next(
+        description for description in SENSOR_DESCRIPTIONS if description.key == key
+    )
+
+
+def test_significant_change_absolute():
+    description = get_description(BATTERY_SOC_ESTIMATION)
+    just_written = timedelta(seconds=10)
+
+    assert description.significant_change(40.0, 40.3, just_written) is False
+    assert description.significant_change(40.0, 39.5, just_written) is True
+    assert description.significant_change(40.0, 40.3, timedelta(minutes=11)) is True
+    assert (
+        description.significant_change(40.0, 40.0, timedelta(minutes=11)) is False
+    ), "Same value isn't reported again"
+    assert description.significant_change(None, 40.0, just_written) is True
+    assert description.significant_change(40.0, None, just_written) is True
+
+
+def test_significant_change_relative():
+    description = get_description(BATTERY_ENERGY_ESTIMATION)
+    just_written = timedelta(seconds=10)
+
+    assert description.significant_change(40.0, 40.1, just_written) is False
+    assert description.significant_change(40.0, 40.2, just_written) is True
+    assert description.significant_change(4.0, 4.03, just_written) is True
+
+
+def test_significant_change_without_rules():
+    description = SLXSensorEntityDescription(key="test")
+    assert description.significant_change(1, 2, timedelta(0)) is True
+    assert description.significant_change(1, 1, timedelta(0)) is False
+
+
+async def test_suppressed_change_written_after_quiet_time(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator_factory
+) -> None:
+    coordinator: SLXChgCtrlUpdateCoordinator = await coordinator_factory
+    manager = coordinator.charging_manager
+    soc_entity_id = next(
+        entity_id
+        for entity_id in hass.states.async_entity_ids(SENSOR_DOMAIN)
+        if entity_id.endswith("battery_soc_estimation")
+    )
+
+    manager._attr_bat_soc_estimated = 40.0
+    coordinator.async_set_updated_data(coordinator.data)
+    await hass.async_block_till_done()
+    assert float(hass.states.get(soc_entity_id).state) == 40.0
+
+    freezer.tick(timedelta(minutes=1))
+    manager._attr_bat_soc_estimated = 40.2
+    coordinator.async_set_updated_data(coordinator.data)
+    await hass.async_block_till_done()
+    assert float(hass.states.get(soc_entity_id).state) == 40.0, "Small change suppressed"
+
+    # no more updates from coordinator
+    freezer.tick(timedelta(minutes=8))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert float(hass.states.get(soc_entity_id).state) == 40.0
+
+    freezer.tick(timedelta(minutes=1, seconds=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert (
+        float(hass.states.get(soc_entity_id).state) == 40.2
+    ), "Pending value written after quiet time"
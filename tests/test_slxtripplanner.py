@@ -1,17 +1,26 @@
 """Test the for the SLXChargingController coordinator."""
 
-from datetime import date, datetime
+import asyncio
+from datetime import date, datetime, timedelta
 from math import isclose
 from unittest.mock import patch
 
+import pytest
+
 from freezegun.api import FrozenDateTimeFactory, freeze_time
 
 from custom_components.slxchargingcontroller.slxtripplanner import (
     ODOMETER_STORAGE_KEY,
+    OdometerDayIndex,
+    PlannerState,
     SLXTripPlanner,
+    _daily_distances_numpy,
+    _daily_distances_python,
+    np,
 )
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import storage
+import homeassistant.util.dt as dt_util
 
 from . import FIXTURE_CONFIG_ENTRY
 
@@ -136,6 +145,136 @@ async def test_tripplanner_merge_storage_and_historical(
         assert len(list_odo) == 8
 
 
+async def test_tripplanner_background_warmup(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Warmup runs in background, planner reports readiness when it is finished"""
+    history_read = asyncio.Event()
+
+    async def slow_historical_odometer(*args) -> list[(datetime, float)]:
+        await history_read.wait()
+        return odometer_list_storage
+
+    tripplanner = SLXTripPlanner(hass)
+    ready_calls: list[bool] = []
+    tripplanner.add_ready_listener(lambda: ready_calls.append(True))
+    assert tripplanner.state is PlannerState.idle
+
+    with patch(
+        "custom_components.slxchargingcontroller.slxtripplanner.SLXTripPlanner._get_historical_odometer",
+        side_effect=slow_historical_odometer,
+    ), patch(
+        "custom_components.slxchargingcontroller.slxtripplanner.SLXTripPlanner._get_statistics",
+        return_value=[],
+    ):
+        freezer.move_to(odometer_test_time)
+        warmup_task = tripplanner.start_warmup(ODOMETER_ENTITY_NAME)
+        await asyncio.sleep(0)
+        assert tripplanner.state is PlannerState.warming_up
+        assert tripplanner.ready is False
+        assert ready_calls == []
+
+        history_read.set()
+        await warmup_task
+
+    assert tripplanner.ready is True
+    assert ready_calls == [True]
+    assert len(tripplanner.odometer_list) == len(odometer_list_storage)
+
+
+async def test_tripplanner_warmup_failed(hass: HomeAssistant) -> None:
+    tripplanner = SLXTripPlanner(hass)
+    with patch(
+        "custom_components.slxchargingcontroller.slxtripplanner.SLXTripPlanner.startup_capture_odometer",
+        side_effect=ValueError("Broken storage"),
+    ):
+        await tripplanner.start_warmup(ODOMETER_ENTITY_NAME)
+    assert tripplanner.state is PlannerState.failed
+
+
+async def test_tripplanner_statistics_chunks(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Full days are read with day resolution in chunks, current day with 5 minutes"""
+    freezer.move_to("2024-02-10 15:30:00+00:00")
+    reads: list[tuple[datetime, datetime, str]] = []
+
+    def statistics_during_period(
+        hass, start_time, end_time, statistic_ids, period, units, types
+    ):
+        reads.append((start_time, end_time, period))
+        row = {
+            "start": start_time.timestamp(),
+            "end": end_time.timestamp(),
+            "state": float(len(reads)),
+        }
+        return {statistic_ids[0]: [row]}
+
+    tripplanner = SLXTripPlanner(hass)
+    tripplanner.odometer_entity = ODOMETER_ENTITY_NAME
+    with patch(
+        "custom_components.slxchargingcontroller.slxtripplanner.statistics.statistics_during_period",
+        side_effect=statistics_during_period,
+    ):
+        time_now = dt_util.utcnow()
+        odometer = await tripplanner._get_statistics(
+            time_now - timedelta(days=300), time_now
+        )
+
+    reads.sort()
+    assert [period for _, _, period in reads] == ["day"] * 10 + ["5minute"]
+    assert reads[0][0] == time_now - timedelta(days=300)
+    assert reads[-1][1] == time_now
+    for (_, previous_end, _), (start, end, _) in zip(reads, reads[1:]):
+        assert previous_end == start, "Chunks are continuous"
+        assert end - start <= timedelta(days=31)
+    assert reads[-1][0] == dt_util.start_of_local_day()
+
+    assert len(odometer) == len(reads)
+    assert odometer[-1][0] == time_now - timedelta(seconds=1), "Reading at period end"
+
+
+async def test_tripplanner_history_pages(hass: HomeAssistant) -> None:
+    """History is read in pages of compressed states"""
+    reads: list[tuple[datetime, datetime, bool]] = []
+
+    def get_significant_states(
+        hass, start_time, end_time, entity_ids, filters, **kwargs
+    ):
+        assert kwargs["compressed_state_format"] is True
+        assert kwargs["no_attributes"] is True
+        reads.append((start_time, end_time, kwargs["include_start_time_state"]))
+        states = [
+            {"s": str(1000 + len(reads)), "lu": start_time.timestamp() + 60},
+            {"s": "unavailable", "lu": start_time.timestamp() + 120},
+            {
+                "s": str(1000.5 + len(reads)),
+                "lu": start_time.timestamp() + 240,
+                "lc": start_time.timestamp() + 180,
+            },
+        ]
+        return {entity_ids[0]: states}
+
+    tripplanner = SLXTripPlanner(hass)
+    tripplanner.odometer_entity = ODOMETER_ENTITY_NAME
+    start_time = datetime.fromisoformat("2024-01-01 00:00:00+00:00")
+    end_time = datetime.fromisoformat("2024-01-20 12:00:00+00:00")
+    with patch(
+        "custom_components.slxchargingcontroller.slxtripplanner.history.get_significant_states",
+        side_effect=get_significant_states,
+    ):
+        odometer = await tripplanner._get_historical_odometer(start_time, end_time)
+
+    assert [include_start for _, _, include_start in reads] == [True, False, False]
+    assert reads[0][0] == start_time
+    assert reads[-1][1] == end_time
+    assert reads[0][1] == reads[1][0] == start_time + timedelta(days=7)
+
+    assert len(odometer) == 6, "Invalid states are skipped"
+    assert odometer[0] == (start_time + timedelta(seconds=60), 1001.0)
+    assert odometer[1] == (start_time + timedelta(seconds=180), 1001.5)
+
+
 def test_append_odometer_list(hass: HomeAssistant):
     tripplanner = SLXTripPlanner(hass)
     odometer_sublist1 = odometer_list_storage[:6]
@@ -153,6 +292,67 @@ def test_calculate_indexes(hass: HomeAssistant):
         assert (a, tripplanner.odometer_index[a]) == b
 
 
+def test_odometer_day_index(hass: HomeAssistant):
+    odometer_index = OdometerDayIndex()
+    odometer_index.set_position(date(2024, 1, 17), 0)
+    odometer_index.set_position(date(2024, 1, 18), 1)
+    odometer_index.set_position(date(2024, 1, 18), 2)
+    odometer_index.set_position(date(2024, 1, 21), 3)
+    # reading from a day which is missing in the index
+    odometer_index.set_position(date(2024, 1, 19), 4)
+
+    assert list(odometer_index.items()) == [
+        (date(2024, 1, 17), 0),
+        (date(2024, 1, 18), 2),
+        (date(2024, 1, 19), 4),
+        (date(2024, 1, 21), 3),
+    ]
+    assert date(2024, 1, 19) in odometer_index
+    assert date(2024, 1, 20) not in odometer_index
+    assert odometer_index.find(date(2024, 1, 20)) == -1
+    assert odometer_index.bisect_left(date(2024, 1, 20)) == 3
+    assert odometer_index.day_at(-1) == date(2024, 1, 21)
+    with pytest.raises(KeyError):
+        odometer_index[date(2024, 1, 20)]
+
+
+@pytest.mark.parametrize(
+    "calculate_distances",
+    [
+        _daily_distances_python,
+        pytest.param(
+            _daily_distances_numpy,
+            marks=pytest.mark.skipif(np is None, reason="numpy not installed"),
+        ),
+    ],
+)
+def test_daily_distances(calculate_distances):
+    # last odometer value of 2024-01-17, 18, 19, 21, 23
+    ordinals = [date(2024, 1, day).toordinal() for day in (17, 18, 19, 21, 23)]
+    readings = [1234.0, 1310.6, 1325.6, 1340.0, 1700.1]
+    start_ordinal = date(2024, 1, 17).toordinal()
+
+    distances = calculate_distances(
+        ordinals, readings, start_ordinal, start_ordinal + 6
+    )
+    expected = [76.6, 15.0, 0.0, 14.4, 0.0, 360.1]
+    assert len(distances) == len(expected)
+    for distance, calculated in zip(expected, distances):
+        assert isclose(distance, calculated)
+    assert distances == _daily_distances_python(
+        ordinals, readings, start_ordinal, start_ordinal + 6
+    ), "Both implementations give identical results"
+
+    # readings outside of requested range are ignored
+    assert calculate_distances(
+        ordinals, readings, start_ordinal + 1, start_ordinal + 3
+    ) == [readings[2] - readings[1], 0.0]
+    assert calculate_distances(ordinals, readings, start_ordinal, start_ordinal) == []
+    assert calculate_distances(
+        ordinals[:1], readings[:1], start_ordinal, start_ordinal + 2
+    ) == [0.0, 0.0]
+
+
 def test_calculate_distance(hass: HomeAssistant):
     tripplanner = SLXTripPlanner(hass)
     tripplanner.odometer_list = odometer_list_storage
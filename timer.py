@@ -1,7 +1,7 @@
 """ module for SlxTimer """
 
 from homeassistant.helpers.event import async_call_later
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HassJob, HomeAssistant, callback
 from datetime import timedelta
 from collections.abc import Callable
 import logging
@@ -19,6 +19,7 @@ class SlxTimer:
         self.hass = hass
         self.wait_time: timedelta = default_time
         self.timer_callback = timer_callback
+        self._job = HassJob(timer_callback, "SlxTimer")
         self.unsub_callback: Callable[[], None] = None
 
     def schedule_timer(self, new_wait_time: timedelta = None):
@@ -30,9 +31,19 @@ class SlxTimer:
         if new_wait_time is not None:
             wait_time_to_use = new_wait_time
         self.unsub_callback = async_call_later(
-            self.hass, wait_time_to_use, self.timer_callback
+            self.hass, wait_time_to_use, self._callback_fired
         )
 
+    @callback
+    def _callback_fired(self, now) -> None:
+        # timer is not scheduled anymore, cancel_timer has nothing to cancel
+        self.unsub_callback = None
+        self.hass.async_run_hass_job(self._job, now)
+
+    @property
+    def scheduled(self) -> bool:
+        return self.unsub_callback is not None
+
     def cancel_timer(self):
         if self.unsub_callback is not None:
             self.unsub_callback()